@@ -15,11 +15,30 @@
         look at https://github.com/matplotlib/cmocean (https://matplotlib.org/cmocean/)
 """
 
+import importlib
+
 from .misc import __version__, MODULE_DIR, DATA_DIR
 
 # Classes that may be of use externally. I.e. by users of CmLib
 from .cmap import CmLib, ColorMap, DataCategory, CmMetaData, CatalogMetaData
-from .qtwidgets.browser import CmLibBrowserDialog
-from .qtwidgets.qimg import makeColorBarPixmap
-from .qtwidgets.selection import ColorSelectionWidget
-from .qtwidgets.table import CmLibModel
+
+# The Qt widgets are imported when first accessed (PEP 562). This way users that only need the
+# color map data don't have to import PyQt (or have it installed).
+_QT_EXPORTS = {
+    'CmLibBrowserDialog': 'browser',
+    'makeColorBarPixmap': 'qimg',
+    'ColorSelectionWidget': 'selection',
+    'CmLibModel': 'table',
+}
+
+__all__ = ['__version__', 'MODULE_DIR', 'DATA_DIR',
+           'CmLib', 'ColorMap', 'DataCategory', 'CmMetaData', 'CatalogMetaData'] + list(_QT_EXPORTS)
+
+
+def __getattr__(name):
+    """ Imports the Qt widgets lazily
+    """
+    if name in _QT_EXPORTS:
+        module = importlib.import_module('.qtwidgets.' + _QT_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
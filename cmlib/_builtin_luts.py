@@ -0,0 +1,193 @@
+""" RGBA uint8 data of frequently used color maps.
+
+    Generated by ingest/make_builtin_luts.py. Do not edit.
+
+    The arrays are created from bytes objects so that they are read-only and no data files need
+    to be read for these color maps.
+"""
+import numpy as np
+
+
+def _lut(hex_str):
+    """ Returns a read-only Nx4 uint8 array from a hexadecimal string with RGBA values.
+    """
+    return np.frombuffer(bytes.fromhex(hex_str), dtype=np.uint8).reshape(-1, 4)
+
+
+# Maps data files, relative to the cmlib data directory, to their RGBA data.
+BUILTIN_RGBA_LUTS = {}
+
+BUILTIN_RGBA_LUTS['MatPlotLib/viridis.csv'] = _lut(
+    '440154ff440256ff450457ff450559ff46075aff46085cff460a5dff460b5eff'
+    '470d60ff470e61ff471063ff471164ff471365ff481467ff481668ff481769ff'
+    '48186aff481a6cff481b6dff481c6eff481d6fff481f70ff482071ff482173ff'
+    '482374ff482475ff482576ff482677ff482878ff482979ff472a7aff472c7aff'
+    '472d7bff472e7cff472f7dff46307eff46327eff46337fff463480ff453581ff'
+    '453781ff453882ff443983ff443a83ff443b84ff433d84ff433e85ff423f85ff'
+    '424086ff424186ff414287ff414487ff404588ff404688ff3f4788ff3f4889ff'
+    '3e4989ff3e4a89ff3e4c8aff3d4d8aff3d4e8aff3c4f8aff3c508bff3b518bff'
+    '3b528bff3a538bff3a548cff39558cff39568cff38588cff38598cff375a8cff'
+    '375b8dff365c8dff365d8dff355e8dff355f8dff34608dff34618dff33628dff'
+    '33638dff32648eff32658eff31668eff31678eff31688eff30698eff306a8eff'
+    '2f6b8eff2f6c8eff2e6d8eff2e6e8eff2e6f8eff2d708eff2d718eff2c718eff'
+    '2c728eff2c738eff2b748eff2b758eff2a768eff2a778eff2a788eff29798eff'
+    '297a8eff297b8eff287c8eff287d8eff277e8eff277f8eff27808eff26818eff'
+    '26828eff26828eff25838eff25848eff25858eff24868eff24878eff23888eff'
+    '23898eff238a8dff228b8dff228c8dff228d8dff218e8dff218f8dff21908dff'
+    '21918cff20928cff20928cff20938cff1f948cff1f958bff1f968bff1f978bff'
+    '1f988bff1f998aff1f9a8aff1e9b8aff1e9c89ff1e9d89ff1f9e89ff1f9f88ff'
+    '1fa088ff1fa188ff1fa187ff1fa287ff20a386ff20a486ff21a585ff21a685ff'
+    '22a785ff22a884ff23a983ff24aa83ff25ab82ff25ac82ff26ad81ff27ad81ff'
+    '28ae80ff29af7fff2ab07fff2cb17eff2db27dff2eb37cff2fb47cff31b57bff'
+    '32b67aff34b679ff35b779ff37b878ff38b977ff3aba76ff3bbb75ff3dbc74ff'
+    '3fbc73ff40bd72ff42be71ff44bf70ff46c06fff48c16eff4ac16dff4cc26cff'
+    '4ec36bff50c46aff52c569ff54c568ff56c667ff58c765ff5ac864ff5cc863ff'
+    '5ec962ff60ca60ff63cb5fff65cb5eff67cc5cff69cd5bff6ccd5aff6ece58ff'
+    '70cf57ff73d056ff75d054ff77d153ff7ad151ff7cd250ff7fd34eff81d34dff'
+    '84d44bff86d549ff89d548ff8bd646ff8ed645ff90d743ff93d741ff95d840ff'
+    '98d83eff9bd93cff9dd93bffa0da39ffa2da37ffa5db36ffa8db34ffaadc32ff'
+    'addc30ffb0dd2fffb2dd2dffb5de2bffb8de29ffbade28ffbddf26ffc0df25ff'
+    'c2df23ffc5e021ffc8e020ffcae11fffcde11dffd0e11cffd2e21bffd5e21aff'
+    'd8e219ffdae319ffdde318ffdfe318ffe2e418ffe5e419ffe7e419ffeae51aff'
+    'ece51bffefe51cfff1e51dfff4e61efff6e620fff8e621fffbe723fffde725ff'
+)
+
+BUILTIN_RGBA_LUTS['MatPlotLib/plasma.csv'] = _lut(
+    '0d0887ff100788ff130789ff16078aff19068cff1b068dff1d068eff20068fff'
+    '220690ff240691ff260591ff280592ff2a0593ff2c0594ff2e0595ff2f0596ff'
+    '310597ff330597ff350498ff370499ff38049aff3a049aff3c049bff3e049cff'
+    '3f049cff41049dff43039eff44039eff46039fff48039fff4903a0ff4b03a1ff'
+    '4c02a1ff4e02a2ff5002a2ff5102a3ff5302a3ff5502a4ff5601a4ff5801a4ff'
+    '5901a5ff5b01a5ff5c01a6ff5e01a6ff6001a6ff6100a7ff6300a7ff6400a7ff'
+    '6600a7ff6700a8ff6900a8ff6a00a8ff6c00a8ff6e00a8ff6f00a8ff7100a8ff'
+    '7201a8ff7401a8ff7501a8ff7701a8ff7801a8ff7a02a8ff7b02a8ff7d03a8ff'
+    '7e03a8ff8004a8ff8104a7ff8305a7ff8405a7ff8606a6ff8707a6ff8808a6ff'
+    '8a09a5ff8b0aa5ff8d0ba5ff8e0ca4ff8f0da4ff910ea3ff920fa3ff9410a2ff'
+    '9511a1ff9613a1ff9814a0ff99159fff9a169fff9c179eff9d189dff9e199dff'
+    'a01a9cffa11b9bffa21d9affa31e9affa51f99ffa62098ffa72197ffa82296ff'
+    'aa2395ffab2494ffac2694ffad2793ffae2892ffb02991ffb12a90ffb22b8fff'
+    'b32c8effb42e8dffb52f8cffb6308bffb7318affb83289ffba3388ffbb3488ff'
+    'bc3587ffbd3786ffbe3885ffbf3984ffc03a83ffc13b82ffc23c81ffc33d80ff'
+    'c43e7fffc5407effc6417dffc7427cffc8437bffc9447affca457affcb4679ff'
+    'cc4778ffcc4977ffcd4a76ffce4b75ffcf4c74ffd04d73ffd14e72ffd24f71ff'
+    'd35171ffd45270ffd5536fffd5546effd6556dffd7566cffd8576bffd9586aff'
+    'da5a6affda5b69ffdb5c68ffdc5d67ffdd5e66ffde5f65ffde6164ffdf6263ff'
+    'e06363ffe16462ffe26561ffe26660ffe3685fffe4695effe56a5dffe56b5dff'
+    'e66c5cffe76e5bffe76f5affe87059ffe97158ffe97257ffea7457ffeb7556ff'
+    'eb7655ffec7754ffed7953ffed7a52ffee7b51ffef7c51ffef7e50fff07f4fff'
+    'f0804efff1814dfff1834cfff2844bfff3854bfff3874afff48849fff48948ff'
+    'f58b47fff58c46fff68d45fff68f44fff79044fff79143fff79342fff89441ff'
+    'f89540fff9973ffff9983efff99a3efffa9b3dfffa9c3cfffa9e3bfffb9f3aff'
+    'fba139fffba238fffca338fffca537fffca636fffca835fffca934fffdab33ff'
+    'fdac33fffdae32fffdaf31fffdb130fffdb22ffffdb42ffffdb52efffeb72dff'
+    'feb82cfffeba2cfffebb2bfffebd2afffebe2afffec029fffdc229fffdc328ff'
+    'fdc527fffdc627fffdc827fffdca26fffdcb26fffccd25fffcce25fffcd025ff'
+    'fcd225fffbd324fffbd524fffbd724fffad824fffada24fff9dc24fff9dd25ff'
+    'f8df25fff8e125fff7e225fff7e425fff6e626fff6e826fff5e926fff5eb27ff'
+    'f4ed27fff3ee27fff3f027fff2f227fff1f426fff1f525fff0f724fff0f921ff'
+)
+
+BUILTIN_RGBA_LUTS['MatPlotLib/inferno.csv'] = _lut(
+    '000004ff010005ff010106ff010108ff02010aff02020cff02020eff030210ff'
+    '040312ff040314ff050417ff060419ff07051bff08051dff09061fff0a0722ff'
+    '0b0724ff0c0826ff0d0829ff0e092bff10092dff110a30ff120a32ff140b34ff'
+    '150b37ff160b39ff180c3cff190c3eff1b0c41ff1c0c43ff1e0c45ff1f0c48ff'
+    '210c4aff230c4cff240c4fff260c51ff280b53ff290b55ff2b0b57ff2d0b59ff'
+    '2f0a5bff310a5cff320a5eff340a5fff360961ff380962ff390963ff3b0964ff'
+    '3d0965ff3e0966ff400a67ff420a68ff440a68ff450a69ff470b6aff490b6aff'
+    '4a0c6bff4c0c6bff4d0d6cff4f0d6cff510e6cff520e6dff540f6dff550f6dff'
+    '57106eff59106eff5a116eff5c126eff5d126eff5f136eff61136eff62146eff'
+    '64156eff65156eff67166eff69166eff6a176eff6c186eff6d186eff6f196eff'
+    '71196eff721a6eff741a6eff751b6eff771c6dff781c6dff7a1d6dff7c1d6dff'
+    '7d1e6dff7f1e6cff801f6cff82206cff84206bff85216bff87216bff88226aff'
+    '8a226aff8c2369ff8d2369ff8f2469ff902568ff922568ff932667ff952667ff'
+    '972766ff982766ff9a2865ff9b2964ff9d2964ff9f2a63ffa02a63ffa22b62ff'
+    'a32c61ffa52c60ffa62d60ffa82e5fffa92e5effab2f5effad305dffae305cff'
+    'b0315bffb1325affb3325affb43359ffb63458ffb73557ffb93556ffba3655ff'
+    'bc3754ffbd3853ffbf3952ffc03a51ffc13a50ffc33b4fffc43c4effc63d4dff'
+    'c73e4cffc83f4bffca404affcb4149ffcc4248ffce4347ffcf4446ffd04545ff'
+    'd24644ffd34743ffd44842ffd54a41ffd74b3fffd84c3effd94d3dffda4e3cff'
+    'db503bffdd513affde5238ffdf5337ffe05536ffe15635ffe25734ffe35933ff'
+    'e45a31ffe55c30ffe65d2fffe75e2effe8602dffe9612bffea632affeb6429ff'
+    'eb6628ffec6726ffed6925ffee6a24ffef6c23ffef6e21fff06f20fff1711fff'
+    'f1731dfff2741cfff3761bfff37819fff47918fff57b17fff57d15fff67e14ff'
+    'f68013fff78212fff78410fff8850ffff8870efff8890cfff98b0bfff98c0aff'
+    'f98e09fffa9008fffa9207fffa9407fffb9606fffb9706fffb9906fffb9b06ff'
+    'fb9d07fffc9f07fffca108fffca309fffca50afffca60cfffca80dfffcaa0fff'
+    'fcac11fffcae12fffcb014fffcb216fffcb418fffbb61afffbb81dfffbba1fff'
+    'fbbc21fffbbe23fffac026fffac228fffac42afffac62dfff9c72ffff9c932ff'
+    'f9cb35fff8cd37fff8cf3afff7d13dfff7d340fff6d543fff6d746fff5d949ff'
+    'f5db4cfff4dd4ffff4df53fff4e156fff3e35afff3e55dfff2e661fff2e865ff'
+    'f2ea69fff1ec6dfff1ed71fff1ef75fff1f179fff2f27dfff2f482fff3f586ff'
+    'f3f68afff4f88efff5f992fff6fa96fff8fb9afff9fc9dfffafda1fffcffa4ff'
+)
+
+BUILTIN_RGBA_LUTS['MatPlotLib/magma.csv'] = _lut(
+    '000004ff010005ff010106ff010108ff020109ff02020bff02020dff03030fff'
+    '030312ff040414ff050416ff060518ff06051aff07061cff08071eff090720ff'
+    '0a0822ff0b0924ff0c0926ff0d0a29ff0e0b2bff100b2dff110c2fff120d31ff'
+    '130d34ff140e36ff150e38ff160f3bff180f3dff19103fff1a1042ff1c1044ff'
+    '1d1147ff1e1149ff20114bff21114eff221150ff241253ff251255ff271258ff'
+    '29115aff2a115cff2c115fff2d1161ff2f1163ff311165ff331067ff341069ff'
+    '36106bff38106cff390f6eff3b0f70ff3d0f71ff3f0f72ff400f74ff420f75ff'
+    '440f76ff451077ff471078ff491078ff4a1079ff4c117aff4e117bff4f127bff'
+    '51127cff52137cff54137dff56147dff57157eff59157eff5a167eff5c167fff'
+    '5d177fff5f187fff601880ff621980ff641a80ff651a80ff671b80ff681c81ff'
+    '6a1c81ff6b1d81ff6d1d81ff6e1e81ff701f81ff721f81ff732081ff752181ff'
+    '762181ff782281ff792282ff7b2382ff7c2382ff7e2482ff802582ff812581ff'
+    '832681ff842681ff862781ff882781ff892881ff8b2981ff8c2981ff8e2a81ff'
+    '902a81ff912b81ff932b80ff942c80ff962c80ff982d80ff992d80ff9b2e7fff'
+    '9c2e7fff9e2f7fffa02f7fffa1307effa3307effa5317effa6317dffa8327dff'
+    'aa337dffab337cffad347cffae347bffb0357bffb2357bffb3367affb5367aff'
+    'b73779ffb83779ffba3878ffbc3978ffbd3977ffbf3a77ffc03a76ffc23b75ff'
+    'c43c75ffc53c74ffc73d73ffc83e73ffca3e72ffcc3f71ffcd4071ffcf4070ff'
+    'd0416fffd2426fffd3436effd5446dffd6456cffd8456cffd9466bffdb476aff'
+    'dc4869ffde4968ffdf4a68ffe04c67ffe24d66ffe34e65ffe44f64ffe55064ff'
+    'e75263ffe85362ffe95462ffea5661ffeb5760ffec5860ffed5a5fffee5b5eff'
+    'ef5d5efff05f5efff1605dfff2625dfff2645cfff3655cfff4675cfff4695cff'
+    'f56b5cfff66c5cfff66e5cfff7705cfff7725cfff8745cfff8765cfff9785dff'
+    'f9795dfff97b5dfffa7d5efffa7f5efffa815ffffb835ffffb8560fffb8761ff'
+    'fc8961fffc8a62fffc8c63fffc8e64fffc9065fffd9266fffd9467fffd9668ff'
+    'fd9869fffd9a6afffd9b6bfffe9d6cfffe9f6dfffea16efffea36ffffea571ff'
+    'fea772fffea973fffeaa74fffeac76fffeae77fffeb078fffeb27afffeb47bff'
+    'feb67cfffeb77efffeb97ffffebb81fffebd82fffebf84fffec185fffec287ff'
+    'fec488fffec68afffec88cfffeca8dfffecc8ffffecd90fffecf92fffed194ff'
+    'fed395fffed597fffed799fffed89afffdda9cfffddc9efffddea0fffde0a1ff'
+    'fde2a3fffde3a5fffde5a7fffde7a9fffde9aafffdebacfffcecaefffceeb0ff'
+    'fcf0b2fffcf2b4fffcf4b6fffcf6b8fffcf7b9fffcf9bbfffcfbbdfffcfdbfff'
+)
+
+BUILTIN_RGBA_LUTS['MatPlotLib/cividis.csv'] = _lut(
+    '00224eff00234fff002451ff002553ff002554ff002656ff002758ff002859ff'
+    '00285bff00295dff002a5fff002a61ff002b62ff002c64ff002c66ff002d68ff'
+    '002e6aff002e6cff002f6dff00306fff003070ff003170ff003171ff013271ff'
+    '053371ff083370ff0c3470ff0f3570ff123570ff143670ff163770ff18376fff'
+    '1a386fff1c396fff1e3a6fff203a6fff213b6eff233c6eff243c6eff263d6eff'
+    '273e6eff293f6eff2a3f6dff2b406dff2d416dff2e416dff2f426dff31436dff'
+    '32436dff33446dff34456cff35456cff36466cff38476cff39486cff3a486cff'
+    '3b496cff3c4a6cff3d4a6cff3e4b6cff3f4c6cff404c6cff414d6cff424e6cff'
+    '434e6cff444f6cff45506cff46516cff47516cff48526cff49536cff4a536cff'
+    '4b546cff4c556cff4d556cff4e566cff4f576cff50576cff51586dff52596dff'
+    '535a6dff545a6dff555b6dff555c6dff565c6dff575d6dff585e6dff595e6eff'
+    '5a5f6eff5b606eff5c616eff5d616eff5e626eff5e636fff5f636fff60646fff'
+    '61656fff62656fff636670ff646770ff656870ff656870ff666970ff676a71ff'
+    '686a71ff696b71ff6a6c71ff6b6d72ff6c6d72ff6c6e72ff6d6f72ff6e6f73ff'
+    '6f7073ff707173ff717274ff727274ff727374ff737475ff747475ff757575ff'
+    '767676ff777776ff777777ff787877ff797977ff7a7a78ff7b7a78ff7c7b78ff'
+    '7d7c78ff7e7c78ff7e7d78ff7f7e78ff807f78ff817f78ff828079ff838179ff'
+    '848279ff858279ff868379ff878478ff888578ff898578ff8a8678ff8b8778ff'
+    '8c8878ff8d8878ff8e8978ff8f8a78ff908b78ff918b78ff928c78ff928d78ff'
+    '938e78ff948e77ff958f77ff969077ff979177ff989277ff999277ff9a9376ff'
+    '9b9476ff9c9576ff9d9576ff9e9676ff9f9775ffa09875ffa19975ffa29975ff'
+    'a39a74ffa49b74ffa59c74ffa69c74ffa79d73ffa89e73ffa99f73ffaaa073ff'
+    'aba072ffaca172ffada272ffaea371ffafa471ffb0a571ffb1a570ffb3a670ff'
+    'b4a76fffb5a86fffb6a96fffb7a96effb8aa6effb9ab6dffbaac6dffbbad6dff'
+    'bcae6cffbdae6cffbeaf6bffbfb06bffc0b16affc1b26affc2b369ffc3b369ff'
+    'c4b468ffc5b568ffc6b667ffc7b767ffc8b866ffc9b965ffcbb965ffccba64ff'
+    'cdbb63ffcebc63ffcfbd62ffd0be62ffd1bf61ffd2c060ffd3c05fffd4c15fff'
+    'd5c25effd6c35dffd7c45cffd9c55cffdac65bffdbc75affdcc859ffddc858ff'
+    'dec958ffdfca57ffe0cb56ffe1cc55ffe2cd54ffe4ce53ffe5cf52ffe6d051ff'
+    'e7d150ffe8d24fffe9d34effead34cffebd44bffedd54affeed649ffefd748ff'
+    'f0d846fff1d945fff2da44fff3db42fff5dc41fff6dd3ffff7de3efff8df3cff'
+    'f9e03afffbe138fffce236fffde334fffee434fffee535fffee636fffee838ff'
+)
@@ -0,0 +1,76 @@
+""" Optional Numba kernels
+
+    Numba is not a requirement of CmLib. The kernels are only defined if the CMLIB_USE_NUMBA
+    environment variable is set to 1 and Numba can be imported. Otherwise HAS_NUMBA is False and
+    the callers use their NumPy implementation.
+
+    Using Numba is opt-in because the (one time) compilation of the kernels takes longer than
+    converting a few hundred colors with NumPy. It pays off when many or large color maps are
+    processed.
+"""
+import logging
+import os
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+HAS_NUMBA = False
+
+if os.environ.get('CMLIB_USE_NUMBA', '0') == '1':
+    try:
+        from numba import njit, prange
+    except ImportError:
+        logger.warning("CMLIB_USE_NUMBA is set but Numba can't be imported. Using NumPy.")
+    else:
+        HAS_NUMBA = True
+
+
+if HAS_NUMBA:
+
+    @njit(parallel=True, cache=True)
+    def rgb_f32_to_rgba_u8(rgb, out):
+        """ Converts an Nx3 float32 array with values between 0 and 1 to Nx4 uint8 RGBA values.
+
+            Writes the result in the out array. The alpha column is set to 255. The rounding is
+            the same as in the NumPy implementation (misc.rgb_floats_to_rgba_uint8).
+        """
+        scale = np.float32(255.0)
+        for i in prange(rgb.shape[0]):
+            for j in range(3):
+                value = np.rint(rgb[i, j] * scale)
+                out[i, j] = min(255, max(0, int(value)))
+            out[i, 3] = 255
+
+
+    @njit(parallel=True, cache=True)
+    def scale_clip_to_u8(img, num_colors, out):
+        """ Converts a 2D float array with values between 0 and 1 to indices in a color map.
+
+            Does the same as np.clip(img * num_colors, 0, num_colors - 1).astype(np.uint8), but
+            in a single pass and without temporary arrays. The result is written in out.
+        """
+        max_index = num_colors - 1
+        for i in prange(img.shape[0]):
+            for j in range(img.shape[1]):
+                value = img[i, j] * num_colors
+                if not value >= 0:  # Also true for NaN
+                    out[i, j] = 0
+                elif value > max_index:
+                    out[i, j] = max_index
+                else:
+                    out[i, j] = int(value)
+
+
+    @njit(cache=True)
+    def rgba_u8_to_bgra_u8(rgba, out):
+        """ Swaps the red and blue channels of an Nx4 uint8 RGBA array.
+
+            Writes the result in the out array in a single pass. Not parallel because color maps
+            are too small to benefit from multiple threads.
+        """
+        for i in range(rgba.shape[0]):
+            out[i, 0] = rgba[i, 2]
+            out[i, 1] = rgba[i, 1]
+            out[i, 2] = rgba[i, 0]
+            out[i, 3] = rgba[i, 3]
@@ -64,19 +64,34 @@
 """
 import abc
 import enum
-import glob
+import functools
 import json
 import logging
 import os.path
 
-from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
-from .misc import check_class, check_is_an_array, load_rgb_floats
+from . import _builtin_luts
+from ._numba_kernels import HAS_NUMBA
+from .misc import (DATA_DIR, check_class, check_is_an_array, load_json, load_rgb_floats_cached,
+                   npy_file_name, rgba_cache_file_name, rgb_floats_to_rgba_uint8,
+                   save_rgb_floats_npy, save_rgba_uint8_npy, write_file_atomically)
+
+if HAS_NUMBA:
+    from ._numba_kernels import rgba_u8_to_bgra_u8
 
 logger = logging.getLogger(__name__)
 
+# Thread pool that is shared by all CmLib objects to read meta data files.
+_EXECUTOR = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+
+# The built-in RGBA data by the absolute path of the packaged data file it was generated from. The
+# packaged data files are trusted to match: the ingest step regenerates the _builtin_luts module.
+_BUILTIN_LUTS_BY_FILE = {os.path.join(DATA_DIR, *rel_file_name.split('/')): lut
+                         for rel_file_name, lut in _builtin_luts.BUILTIN_RGBA_LUTS.items()}
+
 class DataCategory(enum.Enum):
     Sequential = 1
     Cyclic = 2
@@ -86,11 +101,32 @@ class DataCategory(enum.Enum):
 
 
 
+@functools.lru_cache(maxsize=None)
+def _make_pretty_name(name):
+    """ Replaces underscore with hyphens. Capitalizes the first letter and after hyphens.
+
+        Memoized because the same names are converted repeatedly.
+    """
+    partsIn = name.replace('_', '-').split('-')
+    partsOut = []
+
+    for part in partsIn:
+        # We cant user string.capitalize because it will make lower case of some letters
+        partsOut.append(part[:1].upper() + part[1:])
+
+    return "-".join(partsOut)
+
+
+
 # TODO: in the future we perhaps could use Python 3.7 Data Classes
 class AbstractMetaData():
 
     __metaclass__ = abc.ABCMeta
 
+    # The meta data classes use __slots__ so that they don't need an instance __dict__.
+    # This makes them smaller and attribute access faster.
+    __slots__ = ()
+
     @abc.abstractmethod
     def from_dict(self, dct):
         raise NotImplementedError()
@@ -101,13 +137,16 @@ class AbstractMetaData():
 
     def load_from_json(self, file_name):
         logger.debug("Loading meta data: {}".format(os.path.abspath(file_name)))
-        with open(file_name, 'r') as fp:
-            return self.from_dict(json.load(fp))
+        return self.from_dict(load_json(file_name))
 
     def save_to_json_file(self, file_name):
+        """ Saves the meta data to a JSON file.
+
+            The contents are written with write_file_atomically, so an interrupted (or parallel)
+            ingest never leaves a truncated JSON file behind.
+        """
         logger.debug("Saving: {}".format(os.path.abspath(file_name)))
-        with open(file_name, 'w') as fp:
-            json.dump(self.as_dict(), fp, indent=4)
+        write_file_atomically(file_name, json.dumps(self.as_dict(), indent=4))
 
     @classmethod
     def create_from_json(cls, file_name):
@@ -118,6 +157,10 @@ class AbstractMetaData():
 
 class CmMetaData(AbstractMetaData):
 
+    __slots__ = ('name', 'pretty_name', 'file_name', 'recommended', 'category',
+                 'perceptually_uniform', 'black_white_friendly', 'color_blind_friendly',
+                 'isoluminant', 'notes', 'tags', 'favorite')
+
     def __init__(self, name=""):
         self.name = name
         self.pretty_name = self.make_pretty_name(name)
@@ -138,14 +181,7 @@ class CmMetaData(AbstractMetaData):
     def make_pretty_name(cls, name):
         """ Replaces underscore with hyphens. Capitalizes the first letter and after hyphens.
         """
-        partsIn = name.replace('_', '-').split('-')
-        partsOut = []
-
-        for part in partsIn:
-            # We cant user string.capitalize because it will make lower case of some letters
-            partsOut.append(part[:1].upper() + part[1:])
-
-        return "-".join(partsOut)
+        return _make_pretty_name(name)
 
 
     def from_dict(self, dct):
@@ -164,18 +200,19 @@ class CmMetaData(AbstractMetaData):
 
 
     def as_dict(self):
-        dct = OrderedDict(
-            name = self.name,
-            pretty_name = self.pretty_name,
-            file_name = self.file_name,
-            category = self.category.name,
-            recommended = self.recommended,
-            perceptually_uniform = self.perceptually_uniform,
-            black_white_friendly = self.black_white_friendly,
-            color_blind_friendly = self.color_blind_friendly,
-            isoluminant = self.isoluminant,
-            notes = self.notes,
-            tags = self.tags)
+        dct = {
+            "name": self.name,
+            "pretty_name": self.pretty_name,
+            "file_name": self.file_name,
+            "category": self.category.name,
+            "recommended": self.recommended,
+            "perceptually_uniform": self.perceptually_uniform,
+            "black_white_friendly": self.black_white_friendly,
+            "color_blind_friendly": self.color_blind_friendly,
+            "isoluminant": self.isoluminant,
+            "notes": self.notes,
+            "tags": self.tags,
+        }
 
         # Only persistent if explicitly set to True or False
         if self.favorite is not None:
@@ -190,6 +227,8 @@ class CatalogMetaData(AbstractMetaData):
     """
     DEFAULT_FILE_NAME = "_catalog.json"
 
+    __slots__ = ('key', 'name', 'version', 'date', 'author', 'url', 'doi', 'license')
+
     def __init__(self, key="", name=""):
         self.key = key   # unique idenfifier for the color map
         self.name = name
@@ -213,26 +252,31 @@ class CatalogMetaData(AbstractMetaData):
 
 
     def as_dict(self):
-        return OrderedDict(
-            key = self.key,
-            name = self.name,
-            version = self.version,
-            date = self.date,
-            author = self.author,
-            url = self.url,
-            doi = self.doi,
-            license = self.license)
+        return {
+            "key": self.key,
+            "name": self.name,
+            "version": self.version,
+            "date": self.date,
+            "author": self.author,
+            "url": self.url,
+            "doi": self.doi,
+            "license": self.license,
+        }
 
 
 
 class ColorMap(object):
     """ Represents color map data.
     """
+    __slots__ = ('_key', '_prettyName', '_rgb_float_array', '_rgba_uint8_array',
+                 '_bgra_uint8_array', '_meta_data', '_catalog_meta_data', 'rgb_file_name')
+
     def __init__(self, meta_data, catalog_meta_data, rgb_file_name=None):
         self._key = None
         self._prettyName = None
         self._rgb_float_array = None
         self._rgba_uint8_array = None
+        self._bgra_uint8_array = None
         self._meta_data = None
         self._catalog_meta_data = None
 
@@ -253,12 +297,19 @@ class ColorMap(object):
     @property
     def key(self):
         """ Uniquely identifies the map."""
-        if self._key is None:
-            # Using pretty_name which all start with capitals. This yields better sorting.
-            self._key = "{}/{}".format(self.catalog_meta_data.key, self.meta_data.pretty_name)
         return self._key
 
 
+    def _update_key(self):
+        """ Computes the key. Called when the meta data changes so that the key getter is cheap.
+        """
+        if self._meta_data is None or self._catalog_meta_data is None:
+            self._key = None
+        else:
+            # Using pretty_name which all start with capitals. This yields better sorting.
+            self._key = "{}/{}".format(self._catalog_meta_data.key, self._meta_data.pretty_name)
+
+
     @property
     def meta_data(self):
         return self._meta_data
@@ -266,9 +317,10 @@ class ColorMap(object):
 
     @meta_data.setter
     def meta_data(self, md):
-        check_class(md, CmMetaData, allowNone=True)
+        if __debug__:
+            check_class(md, CmMetaData, allowNone=True)
         self._meta_data = md
-        self._key = None # invalidate cache
+        self._update_key()
 
 
     @property
@@ -278,9 +330,19 @@ class ColorMap(object):
 
     @catalog_meta_data.setter
     def catalog_meta_data(self, cmd):
-        check_class(cmd, CatalogMetaData, allowNone=True)
+        if __debug__:
+            check_class(cmd, CatalogMetaData, allowNone=True)
         self._catalog_meta_data = cmd
-        self._key = None # invalidate cache
+        self._update_key()
+
+
+    @property
+    def rgba_cache_file_name(self):
+        """ The file where the RGBA uint8 data is cached. None if there is no rgb file.
+        """
+        if self.rgb_file_name is None:
+            return None
+        return rgba_cache_file_name(self.rgb_file_name)
 
 
     @property
@@ -300,40 +362,52 @@ class ColorMap(object):
         if file_name is None:
             file_name = self.rgb_file_name
 
-        self.set_rgb_float_array(load_rgb_floats(file_name))
+        self.set_rgb_float_array(self._load_rgb_floats(file_name))
 
 
-    def set_rgb_float_array(self, rgb_arr):
-        """ Explicitly sets the rgb data.
+    @staticmethod
+    def _load_rgb_floats(file_name):
+        """ Loads the rgb floats from file.
 
-            Typically not used directly because the rgb data is loaded automatically when needed.
-        """
-        check_is_an_array(rgb_arr)
-        assert rgb_arr.ndim == 2, "Expected 2D array. Got {}D".format(rgb_arr.ndim)
-        _, n_cols = rgb_arr.shape
-        assert n_cols == 3, "Expected 3 columns. Got: {}".format(n_cols)
-        if rgb_arr.dtype != np.float32:
-            raise TypeError("Expected np.float32. Got: {}".format(rgb_arr.dtype))
+            The binary .npy file of the text file in the user cache directory is used if it
+            exists, and is not older than the text file, because it doesn't need parsing.
+            Otherwise, or if the .npy file can't be loaded, the text file is read and the .npy
+            file is (re)written so that it can be used the next time.
 
-        self._rgb_float_array = rgb_arr
+            The arrays are cached process-wide and are read-only, so all color maps that refer
+            to the same file share the same data.
+        """
+        npy_file = npy_file_name(file_name)
+        if (os.path.exists(npy_file) and
+                os.path.getmtime(npy_file) >= os.path.getmtime(file_name)):
+            try:
+                return load_rgb_floats_cached(npy_file)
+            except (ValueError, EOFError, OSError) as ex:
+                logger.warning("Regenerating corrupt rgb cache file {}: {}".format(npy_file, ex))
+
+        rgb_floats = load_rgb_floats_cached(file_name)
+        try:
+            save_rgb_floats_npy(npy_file, rgb_floats)
+        except OSError as ex:
+            # The cache directory may not be writable. Not a problem, just slower next time.
+            logger.debug("Unable to write rgb cache file {}: {}".format(npy_file, ex))
+        return rgb_floats
 
 
-    def _read_rgb_uint8_file(self, file_name=None):
-        """ Loads the RGB data from file.
+    def set_rgb_float_array(self, rgb_arr):
+        """ Explicitly sets the rgb data.
 
-            :param str file_name: the rgb file. If None, the rgb_file_name property will be used.
+            Typically not used directly because the rgb data is loaded automatically when needed.
         """
-        if file_name is None:
-            file_name = self.rgb_file_name
-        rgb_floats = load_rgb_floats(file_name)
+        if __debug__:  # The checks are skipped when running Python with -O
+            check_is_an_array(rgb_arr)
+            assert rgb_arr.ndim == 2, "Expected 2D array. Got {}D".format(rgb_arr.ndim)
+            _, n_cols = rgb_arr.shape
+            assert n_cols == 3, "Expected 3 columns. Got: {}".format(n_cols)
+            if rgb_arr.dtype != np.float32:
+                raise TypeError("Expected np.float32. Got: {}".format(rgb_arr.dtype))
 
-        # Convert from float to bytes and append column
-        rgb_floats *= 256
-        rgb_floats = np.clip(rgb_floats, 0, 255)
-        n_rows, depth = rgb_floats.shape
-        assert depth == 3, "sanity check"
-
-        return rgb_floats.astype(np.uint8)
+        self._rgb_float_array = rgb_arr
 
 
     @property
@@ -358,14 +432,97 @@ class ColorMap(object):
         return self._rgba_uint8_array
 
 
+    @property
+    def num_colors(self):
+        """ The number of colors in the color map. Loads the data from file if needed.
+        """
+        return len(self.rgba_uint8_array)
+
+
+    @property
+    def bgra_uint8_array(self):
+        """ Gets the data as bytes in BGRA order. Loads the data from file if needed.
+
+            Returns 4xN array (BGRA). Qt uses this order for ARGB32 images on little-endian
+            machines. The array is computed once and then reused. It is C-contiguous and read-only.
+
+            Uses a Numba kernel if enabled (see the _numba_kernels module).
+        """
+        if self._bgra_uint8_array is None:
+            if HAS_NUMBA:
+                bgra_arr = np.empty_like(self.rgba_uint8_array)
+                rgba_u8_to_bgra_u8(self.rgba_uint8_array, bgra_arr)
+            else:
+                # Swap the red and blue bytes of each color, viewed as little-endian 32 bits integer.
+                # The operations are done in place, with a single temporary array.
+                rgba_u32 = np.ascontiguousarray(self.rgba_uint8_array).view('<u4').reshape(-1)
+                bgra_u32 = rgba_u32 & 0xFF00FF00
+                tmp_u32 = rgba_u32 >> 16
+                tmp_u32 &= 0x000000FF
+                bgra_u32 |= tmp_u32
+                np.bitwise_and(rgba_u32, 0x000000FF, out=tmp_u32)
+                tmp_u32 <<= 16
+                bgra_u32 |= tmp_u32
+                bgra_arr = bgra_u32.astype('<u4', copy=False).view(np.uint8).reshape(-1, 4)
+            bgra_arr.setflags(write=False)
+            self._bgra_uint8_array = bgra_arr
+        return self._bgra_uint8_array
+
+
     def load_rgba_uint8_array(self, file_name=None):
         """ Loads the RGB data from file, converts to uint8 and appends alpha column of 255.
 
+            The result is cached in a binary .npy file in the user cache directory. If this file
+            exists, and is not older than the rgb file, it is loaded instead. A cache file that
+            can't be loaded (e.g. because it is truncated), or that doesn't contain an Nx4 uint8
+            array, is regenerated. The resulting array
+            is read-only so that it can be shared safely.
+
+            Frequently used color maps have their RGBA data embedded in the _builtin_luts module.
+            It is used if the rgb file is the packaged data file that it was generated from (as
+            created by load_catalog). Then no files are read at all.
+
+            If no file_name is given, the RGBA values are derived from the rgb_float_array
+            property, so that the rgb file is not read twice when both are needed.
+
             :param str file_name: the rgb file. If None, the rgb_file_name property will be used.
         """
-        rgb_ints = self._read_rgb_uint8_file(file_name)
-        rgba_ints = np.ones(shape=(len(rgb_ints), 4), dtype=np.uint8) * 255
-        rgba_ints[:, 0:3] = rgb_ints
+        use_own_data = file_name is None
+        if use_own_data:
+            file_name = self.rgb_file_name
+
+        builtin_lut = _BUILTIN_LUTS_BY_FILE.get(file_name)
+        if builtin_lut is not None:
+            logger.debug("Using built-in RGBA values: {}".format(file_name))
+            self.set_rgba_uint8_array(builtin_lut)
+            return
+
+        cache_file = rgba_cache_file_name(file_name)
+        rgba_ints = None
+        if (os.path.exists(cache_file) and
+                os.path.getmtime(cache_file) >= os.path.getmtime(file_name)):
+            logger.debug("Loading RGBA values: {}".format(cache_file))
+            try:
+                rgba_ints = np.load(cache_file)
+                if rgba_ints.ndim != 2 or rgba_ints.shape[1] != 4 or rgba_ints.dtype != np.uint8:
+                    raise ValueError("Expected an Nx4 uint8 array, got {} array with shape {}"
+                                     .format(rgba_ints.dtype, rgba_ints.shape))
+            except (ValueError, EOFError, OSError) as ex:
+                logger.warning("Regenerating corrupt RGBA cache file {}: {}".format(cache_file, ex))
+                rgba_ints = None
+
+        if rgba_ints is None:
+            if use_own_data:
+                rgb_floats = self.rgb_float_array
+            else:
+                rgb_floats = self._load_rgb_floats(file_name)
+            rgba_ints = rgb_floats_to_rgba_uint8(rgb_floats)
+            try:
+                save_rgba_uint8_npy(cache_file, rgba_ints)
+            except OSError as ex:
+                # The cache directory may not be writable. Not a problem, just slower next time.
+                logger.debug("Unable to write RGBA cache file {}: {}".format(cache_file, ex))
+
         self.set_rgba_uint8_array(rgba_ints)
 
 
@@ -373,15 +530,25 @@ class ColorMap(object):
         """ Explicitly sets the RGBA uint8 data.
 
             Typically not used directly because the RGBA data is loaded automatically when needed.
+
+            The color map stores a read-only view on the array (not a copy), so that the data
+            can't be changed through the color map. Otherwise the cached BGRA array, and the
+            pixmaps that are cached by the widgets, would become outdated.
         """
-        check_is_an_array(rgba_arr)
-        assert rgba_arr.ndim == 2, "Expected 2D array. Got {}D".format(rgba_arr.ndim)
-        _, n_cols = rgba_arr.shape
-        assert n_cols == 4, "Expected 4 columns. Got: {}".format(n_cols)
-        if rgba_arr.dtype != np.uint8:
-            raise TypeError("Expected np.uint8. Got: {}".format(rgba_arr.dtype))
+        if __debug__:  # The checks are skipped when running Python with -O
+            check_is_an_array(rgba_arr)
+            assert rgba_arr.ndim == 2, "Expected 2D array. Got {}D".format(rgba_arr.ndim)
+            _, n_cols = rgba_arr.shape
+            assert n_cols == 4, "Expected 4 columns. Got: {}".format(n_cols)
+            if rgba_arr.dtype != np.uint8:
+                raise TypeError("Expected np.uint8. Got: {}".format(rgba_arr.dtype))
+
+        if rgba_arr.flags.writeable:
+            rgba_arr = rgba_arr.view()
+            rgba_arr.setflags(write=False)
 
         self._rgba_uint8_array = rgba_arr
+        self._bgra_uint8_array = None # invalidate cache
 
 
 
@@ -394,6 +561,13 @@ class CmLib(object):
         super(CmLib, self).__init__()
         self._color_maps = []
 
+        # The catalog names and tags of all color maps are updated when color maps are loaded.
+        # The sorted lists are computed when needed and reset when the sets change.
+        self._catalog_name_set = set()
+        self._tag_set = set()
+        self._catalog_names = None
+        self._tags = None
+
 
     @property
     def color_maps(self):
@@ -401,6 +575,24 @@ class CmLib(object):
         return self._color_maps
 
 
+    @property
+    def catalog_names(self):
+        """ The sorted list of unique catalog names of all color maps.
+        """
+        if self._catalog_names is None:
+            self._catalog_names = sorted(self._catalog_name_set)
+        return self._catalog_names
+
+
+    @property
+    def tags(self):
+        """ The sorted list of unique tags of all color maps.
+        """
+        if self._tags is None:
+            self._tags = sorted(self._tag_set)
+        return self._tags
+
+
     def getColorMapByKey(self, key):
         """ Returns a color map having a key. Returns None if not found.
         """
@@ -415,6 +607,10 @@ class CmLib(object):
         """ Removes all color maps
         """
         self._color_maps.clear()
+        self._catalog_name_set.clear()
+        self._tag_set.clear()
+        self._catalog_names = None
+        self._tags = None
 
 
     def load_catalog(self, catalog_dir):
@@ -425,15 +621,27 @@ class CmLib(object):
         catalog_file = os.path.abspath(os.path.join(catalog_dir, CatalogMetaData.DEFAULT_FILE_NAME))
         cmd = CatalogMetaData.create_from_json(catalog_file)
 
-        json_files_glob = os.path.join(catalog_dir, '*.json')
-        for md_file_name in glob.iglob(json_files_glob):
-            if md_file_name.endswith(CatalogMetaData.DEFAULT_FILE_NAME):
+        # A single directory scan, os.scandir gets the file names without extra system calls.
+        with os.scandir(catalog_dir) as entries:
+            md_file_names = [entry.name for entry in entries if entry.name.endswith('.json')]
+
+        md_file_paths = []
+        for md_file_name in md_file_names:
+            if md_file_name == CatalogMetaData.DEFAULT_FILE_NAME:
                 continue # skip catalog json file
 
-            md_file_path = os.path.join(catalog_dir, md_file_name)
-            md = CmMetaData.create_from_json(md_file_path)
+            md_file_paths.append(os.path.join(catalog_dir, md_file_name))
 
+        # The meta data files are read in parallel. The color maps are created in this thread.
+        update_tags = self._tag_set.update  # Bound method as local for the loop
+        for md in _EXECUTOR.map(CmMetaData.create_from_json, md_file_paths):
             rgb_file_path = os.path.join(catalog_dir, md.file_name)
 
             colorMap = ColorMap(meta_data=md, catalog_meta_data=cmd, rgb_file_name=rgb_file_path)
-            self._color_maps.append(colorMap)
\ No newline at end of file
+            self._color_maps.append(colorMap)
+            update_tags(md.tags)
+
+        if md_file_paths:
+            self._catalog_name_set.add(cmd.name)
+        self._catalog_names = None
+        self._tags = None
\ No newline at end of file
@@ -3,152 +3,167 @@
 import logging
 import os.path
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
+try:
+    import cv2  # Optional. Applies look-up tables faster than NumPy.
+except ImportError:
+    cv2 = None
+
 from cmlib.qtwidgets.bindings import QtCore, QtGui, QtWidgets, Qt, QtSlot
 from cmlib.qtwidgets.bindings import PYQT_VERSION, QT_VERSION, QT_API_NAME
 from cmlib.qtwidgets.qimg import arrayToQImage
 from cmlib import CmLib, CmLibModel, ColorSelectionWidget, CmLibBrowserDialog, DATA_DIR
+from cmlib._numba_kernels import HAS_NUMBA
+from cmlib.images import (normalize, makeRamp, makeBandTest, makeConcentricCircles, makeArcTan2,
+                          makeSpiral, makeSineProduct, makeUniformNoise)
 
-logger = logging.getLogger("demo")
-
-# the size of the colormap test images
-SIZE_X = 350
-SIZE_Y = 350
-
-
-def normalize(img):
-    """ Normalizes image values to be between 0 and 1
-    """
-    zMin, zMax = np.amin(img), np.amax(img)
-    offset = zMin
-    zRange = zMax - zMin
-    return (img - offset )/ zRange
-
-
-
-def makeRamp():
-    """ Create 'ramp' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
-
-        Slightly modified version of the test function introduced by Peter Kovesi
-        Good Colour Maps: How to Design Them. Peter Kovesi, arxiv.org, 2015.
-        http://arxiv.org/abs/1509.03700
-
-        Allows to visually assess perceptual uniformity by observing the distance at which the sine \
-        pattern fades.
+if HAS_NUMBA:
+    from cmlib._numba_kernels import scale_clip_to_u8
 
-        :return: 2D numpy array
-    """
-    x = np.linspace(0, 1, num=SIZE_X)
-    y = np.linspace(1, 0, num=SIZE_Y)
-    xx, yy = np.meshgrid(x, y, sparse=False)
-    #z = yy + (xx**2) * np.sin(64 * 2 * np.pi * yy) / 12
-    z = xx + (yy**2) * np.sin(64 * 2 * np.pi * xx) / 12  # Transposed
-    # z = np.clip(z, 0.0, 1.0) # Fails in PyQtGraph 2D plot :-/
-    return z
-
-
-def makeBandTest():
-    """ Create 'ramp' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
-
-        Slightly modified version of the test function introduced by Peter Kovesi
-        Good Colour Maps: How to Design Them. Peter Kovesi, arxiv.org, 2015.
-        http://arxiv.org/abs/1509.03700
-
-        :return: 2D numpy array
-    """
-    x = np.linspace(0, 1, num=SIZE_X)
-    y = np.linspace(1, 0, num=SIZE_Y)
-    xx, yy = np.meshgrid(x, y, sparse=False)
-    z = yy + xx**2  # demonstrates banding
-    return z
+logger = logging.getLogger("demo")
 
+# Some random favorites to test the favorite checkbox
+TEST_FAVORITES = frozenset(['SciColMaps/Oleron', 'CET/CET-CBL1', 'MatPlotLib/Cubehelix'])
 
-def makeConcentricCircles():
-    """ Creates a concentric circle pattern.
 
-        :return: 2D numpy array
-    """
-    x = np.linspace(-10, 10, num=SIZE_X)
-    y = np.linspace(-10, 10, num=SIZE_Y)
-    xx, yy = np.meshgrid(x, y, sparse=False)
-    z = np.sin(xx**2 + yy**2) / (xx**2 + yy**2)
-    return z
+# Look-up tables with 256 colors, by id of the BGRA array of the color map and the scaling flag.
+# The BGRA array is stored in the value as well so that its id can't be reused. Only the most
+# recently used tables are kept, so that the cache doesn't keep the data of all color maps alive.
+_LUT_CACHE = OrderedDict()
+_MAX_LUT_CACHE_SIZE = 32
 
 
-def makeArcTan2():
-    """ Create atan2(x, y), which is good for testing circular color maps.
-        :return: 2D numpy array
-    """
-    x = np.linspace(-1, 1, num=SIZE_X)
-    y = np.linspace(-1, 1, num=SIZE_Y)
-    xx, yy = np.meshgrid(x, y, sparse=False)
-    return np.arctan2(xx, yy)
+def makeLut256(bgra_arr, scaleIndices):
+    """ Returns a look-up table with 256 BGRA colors that can be indexed with uint8 values.
 
+        If scaleIndices is False, the table is padded by repeating the last color. Index i then
+        gives the same color as np.take(bgra_arr, i, axis=0, mode='clip').
 
-def makeSpiral():
-    """ Create 'spiral' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
+        If scaleIndices is True, the colors of the color map are spread over the 256 entries.
+        Index i then gives the same color as the value i/256 in a float image.
 
-        Smoothness test, has a near-uniform distribution of values.
-        :return: 2D numpy array
+        The tables of the most recently used color maps are cached.
     """
-    x = np.linspace(-1, 1, num=SIZE_X)
-    y = np.linspace(-1, 1, num=SIZE_Y)
-    xx, yy = np.meshgrid(x, y, sparse=False)
-    return np.arcsin(np.sin(2 * 2 * np.pi * (xx**2 + yy**2) + np.arctan2(xx, yy)))
+    key = (id(bgra_arr), scaleIndices)
+    cached = _LUT_CACHE.get(key)
+    if cached is not None:
+        _LUT_CACHE.move_to_end(key)
+        return cached[1]
+
+    numColors = len(bgra_arr)
+    if scaleIndices:
+        lut = bgra_arr[np.arange(256) * numColors // 256]
+    else:
+        assert numColors <= 256, "Too many colors: {}".format(numColors)
+        lut = np.empty(shape=(256, 4), dtype=np.uint8)
+        lut[:numColors] = bgra_arr
+        lut[numColors:] = bgra_arr[-1]
 
+    lut.setflags(write=False)
+    _LUT_CACHE[key] = (bgra_arr, lut)
+    if len(_LUT_CACHE) > _MAX_LUT_CACHE_SIZE:
+        _LUT_CACHE.popitem(last=False)  # Remove the least recently used
+    return lut
 
-def makeSineProduct():
-    """ Create 'two sines products' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
 
-        Smoothness test.
-        :return: 2D numpy array
-    """
-    x = np.linspace(-np.pi, np.pi, num=SIZE_X)
-    y = np.linspace(-np.pi, np.pi, num=SIZE_Y)
-    xx, yy = np.meshgrid(x, y, sparse=False)
-    return np.sin(xx) * np.sin(yy) + np.sin(3*xx) * np.sin(3*yy)
+def applyLutCv2(imageArray256, lut, out=None):
+    """ Applies the BGRA look-up table to the uint8 image with OpenCV's LUT function.
 
+        Gives the same result as np.take(lut, imageArray256, axis=0). The table must have
+        256 entries, use makeLut256 to create one. Each color is viewed as a single 32 bits
+        integer so that only one lookup per pixel is needed.
 
-def makeUniformNoise():
-    """ Uniform noise between 0 and 1
+        :param out: optional height x width x 4 uint8 array in which the result is stored.
+        :return: height x width x 4 uint8 array
     """
-    return np.random.uniform(0.0, 1.0, size=(SIZE_X, SIZE_Y))
+    height, width = imageArray256.shape
+    if out is None:
+        imageArrInt32 = cv2.LUT(imageArray256, lut.view(np.int32))
+    else:
+        imageArrInt32 = cv2.LUT(imageArray256, lut.view(np.int32),
+                                dst=out.view(np.int32).reshape(height, width))
+    return imageArrInt32.view(np.uint8).reshape(height, width, 4)
 
 
 def colorizeImageArray(imageArr, colorMap=None,
-                       width=None, height=None, drawBorder=False):
+                       width=None, height=None, drawBorder=False,
+                       outIndices=None, outBGRA=None):
     """ Creates a PixMap that visualizes the color map.
         This can be used in a QLabel to draw a legend.
 
         The resulting pixmap will be WxHxN ARGB
+
+        The imageArr can be a float array with values between 0 and 1, or a uint8 array. The
+        uint8 values are interpreted as value/256, so no scaling and clipping is needed.
+
+        The outIndices (HxW uint8) and outBGRA (HxWx4 uint8) buffers are optional. If given,
+        they are used for the intermediate results, so that repeated calls don't need to
+        allocate new arrays. They are ignored if their shape doesn't match the image.
     """
     assert imageArr.flags['C_CONTIGUOUS'], "expected C-contiguous array"
 
+    if outIndices is not None and outIndices.shape != imageArr.shape:
+        outIndices = None
+    if outBGRA is not None and outBGRA.shape != imageArr.shape + (4,):
+        outBGRA = None
+
     if colorMap is None:
-        imageArray256 = np.clip(imageArr * (256), 0, 255).astype(np.uint8)
+        if imageArr.dtype == np.uint8:
+            imageArray256 = imageArr
+        else:
+            imageArray256 = np.clip(imageArr * (256), 0, 255).astype(np.uint8)
 
-        imageArrBGRA = np.multiply.outer(imageArray256, np.ones(shape=(4,), dtype=np.uint8))
-        imageArrBGRA[:, :, 3] = 255  # Set all alpha values to 255
+        if outBGRA is None:
+            imageArrBGRA = np.empty(imageArray256.shape + (4,), dtype=np.uint8)
+        else:
+            imageArrBGRA = outBGRA
+
+        if cv2 is not None:
+            # Copies the gray values to B, G and R and sets alpha to 255 in a single pass.
+            cv2.cvtColor(imageArray256, cv2.COLOR_GRAY2BGRA, dst=imageArrBGRA)
+        else:
+            imageArrBGRA[:, :, 0:3] = imageArray256[:, :, np.newaxis]  # Broadcast to B, G and R
+            imageArrBGRA[:, :, 3] = 255  # Set all alpha values to 255
     else:
-        rgba_arr = colorMap.rgba_uint8_array
-
-        numColors = len(rgba_arr)
-        imageArray256 = np.clip(imageArr * (numColors), 0, numColors-1).astype(np.uint8)
-        # Shuffle dimensions to BGRA from RGBA  (which is what Qt uses for ARGB in little-endian mode)
-        # Do this by swapping index 0 and 2. If using bgra_arr = rgba_arr[:, [2, 1, 0, 3]], the
-        # resulting bgra_arr will be fortran-contiguous, which would have to be fixed later on.
-        # Swapping dimensions is faster
-        bgra_arr = np.copy(rgba_arr)
-        bgra_arr[:, 0] = rgba_arr[:, 2]
-        bgra_arr[:, 2] = rgba_arr[:, 0]
-        del rgba_arr
+        # BGRA is what Qt uses for ARGB in little-endian mode. It's cached by the color map.
+        bgra_arr = colorMap.bgra_uint8_array
+        numColors = colorMap.num_colors
+
+        if imageArr.dtype == np.uint8:
+            # The image values can be used as indices directly.
+            imageArray256 = imageArr
+            lut = makeLut256(bgra_arr, scaleIndices=True)
+        else:
+            if outIndices is None:
+                imageArray256 = np.empty(imageArr.shape, dtype=np.uint8)
+            else:
+                imageArray256 = outIndices
+
+            if HAS_NUMBA:
+                scale_clip_to_u8(imageArr, numColors, imageArray256)
+            else:
+                # Clip in-place to avoid a second temporary array.
+                scaled = np.multiply(imageArr, numColors)
+                np.clip(scaled, 0, numColors-1, out=scaled)
+                np.copyto(imageArray256, scaled, casting='unsafe')
+                del scaled
+
+            lut = makeLut256(bgra_arr, scaleIndices=False) if numColors <= 256 else bgra_arr
 
         # Apply colormap
-        imageArrBGRA = np.take(bgra_arr, imageArray256, axis=0, mode='clip')
+        if cv2 is not None and len(lut) == 256:
+            imageArrBGRA = applyLutCv2(imageArray256, lut, out=outBGRA)
+        else:
+            imageArrBGRA = np.take(lut, imageArray256, axis=0, mode='clip', out=outBGRA)
 
     assert imageArrBGRA.flags['C_CONTIGUOUS'], "expected C-contiguous array"
-    image = arrayToQImage(imageArrBGRA, share_memory=False)
+    # Sharing memory is safe because the image is a local variable. QImage.scaled and
+    # QPixmap.fromImage make a deep copy, so the pixmap doesn't refer to the (reused) array.
+    image = arrayToQImage(imageArrBGRA, share_memory=True)
 
     # Scale image if height of width are defined
     if width is not None or height is not None:
@@ -185,6 +200,9 @@ class DemoWindow(QtWidgets.QWidget):
         #self._imageArray = makeRamp()
 
         self._currentColorMap = None
+        self._imageCache = {}  # Normalized images, by image function
+        self._indicesBuffer = None
+        self._bgraBuffer = None
 
         self.imageComboBox = QtWidgets.QComboBox()
         self.imageComboBox.addItem("Ramp", userData=makeRamp)
@@ -252,8 +270,15 @@ class DemoWindow(QtWidgets.QWidget):
         """ Colorizes the image with the color map.
         """
         self._currentColorMap = colorMap
+
+        # Reuse the buffers for the intermediate results. Only reallocate if the image changed.
+        if self._indicesBuffer is None or self._indicesBuffer.shape != self._imageArray.shape:
+            self._indicesBuffer = np.empty(self._imageArray.shape, dtype=np.uint8)
+            self._bgraBuffer = np.empty(self._imageArray.shape + (4,), dtype=np.uint8)
+
         pixMap = colorizeImageArray(self._imageArray, colorMap=colorMap,
-                                    drawBorder=self._drawBorder)
+                                    drawBorder=self._drawBorder,
+                                    outIndices=self._indicesBuffer, outBGRA=self._bgraBuffer)
         self.imageLabel.setPixmap(pixMap)
 
 
@@ -263,29 +288,40 @@ class DemoWindow(QtWidgets.QWidget):
         """
         imgFunction = self.imageComboBox.currentData()
         logger.debug("On image changed: {}".format(imgFunction))
-        self._imageArray = normalize(imgFunction())
+        if imgFunction not in self._imageCache:
+            self._imageCache[imgFunction] = normalize(imgFunction())
+        self._imageArray = self._imageCache[imgFunction]
 
-        logger.debug("Image value range: ({:5.2f}, {:5.2f})"
-                     .format(np.amin(self._imageArray), np.amax(self._imageArray)))
+        if logger.isEnabledFor(logging.DEBUG):  # Avoid scanning the image when not debugging
+            logger.debug("Image value range: ({:5.2f}, {:5.2f})"
+                         .format(np.amin(self._imageArray), np.amax(self._imageArray)))
 
         self.updateImageLabel(self._currentColorMap)
 
 
-def main():
-    app = QtWidgets.QApplication([])
-
-    cm_lib = CmLib()
+def loadCatalogs(cm_lib):
+    """ Loads the catalogs that are used in the demo
+    """
     cm_lib.load_catalog(os.path.join(DATA_DIR, 'ColorBrewer2'))
     cm_lib.load_catalog(os.path.join(DATA_DIR, 'CET'))
     cm_lib.load_catalog(os.path.join(DATA_DIR, 'MatPlotLib'))
     cm_lib.load_catalog(os.path.join(DATA_DIR, 'SciColMaps'))
 
-    logger.debug("Number of color maps: {}".format(len(cm_lib.color_maps)))
 
-    # Set some random favorites to test the favorite checkbox
+def main():
+    cm_lib = CmLib()
+
+    # The catalogs are loaded in a background thread while Qt is initialized. The model and
+    # widgets need all color maps (e.g. for the filters), so we wait for it before creating them.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(loadCatalogs, cm_lib)
+        app = QtWidgets.QApplication([])
+        future.result()  # Re-raises exceptions of the background thread
+
+    logger.debug("Number of color maps: {}".format(len(cm_lib.color_maps)))
 
     for colorMap in cm_lib.color_maps:
-        if colorMap.key in ['SciColMaps/Oleron', 'CET/CET-CBL1', 'MatPlotLib/Cubehelix']:
+        if colorMap.key in TEST_FAVORITES:
             colorMap.meta_data.favorite = True
 
     cmLibModel = CmLibModel(cm_lib)
@@ -0,0 +1,113 @@
+""" Test images for assessing color maps.
+
+    The functions in this module only need NumPy, so they can be used without Qt (e.g. from
+    a Jupyter notebook).
+"""
+import numpy as np
+
+# the size of the colormap test images
+SIZE_X = 350
+SIZE_Y = 350
+
+
+def normalize(img):
+    """ Normalizes image values to be between 0 and 1
+
+        Returns a float32 array. The calculation is done in-place, so if img is already a
+        float32 array it will be modified.
+    """
+    img = img.astype(np.float32, copy=False)
+    zMin, zMax = np.amin(img), np.amax(img)
+    np.subtract(img, zMin, out=img)
+    np.divide(img, zMax - zMin, out=img)
+    return img
+
+
+
+def makeRamp():
+    """ Create 'ramp' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
+
+        Slightly modified version of the test function introduced by Peter Kovesi
+        Good Colour Maps: How to Design Them. Peter Kovesi, arxiv.org, 2015.
+        http://arxiv.org/abs/1509.03700
+
+        Allows to visually assess perceptual uniformity by observing the distance at which the sine \
+        pattern fades.
+
+        :return: 2D numpy array
+    """
+    x = np.linspace(0, 1, num=SIZE_X, dtype=np.float32)
+    y = np.linspace(1, 0, num=SIZE_Y, dtype=np.float32)
+    xx, yy = x[np.newaxis, :], y[:, np.newaxis]  # Broadcasting instead of a full meshgrid
+    #z = yy + (xx**2) * np.sin(64 * 2 * np.pi * yy) / 12
+    z = xx + (yy**2) * np.sin(64 * 2 * np.pi * xx) / 12  # Transposed
+    # z = np.clip(z, 0.0, 1.0) # Fails in PyQtGraph 2D plot :-/
+    return z
+
+
+def makeBandTest():
+    """ Create 'ramp' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
+
+        Slightly modified version of the test function introduced by Peter Kovesi
+        Good Colour Maps: How to Design Them. Peter Kovesi, arxiv.org, 2015.
+        http://arxiv.org/abs/1509.03700
+
+        :return: 2D numpy array
+    """
+    x = np.linspace(0, 1, num=SIZE_X, dtype=np.float32)
+    y = np.linspace(1, 0, num=SIZE_Y, dtype=np.float32)
+    xx, yy = x[np.newaxis, :], y[:, np.newaxis]
+    z = yy + xx**2  # demonstrates banding
+    return z
+
+
+def makeConcentricCircles():
+    """ Creates a concentric circle pattern.
+
+        :return: 2D numpy array
+    """
+    x = np.linspace(-10, 10, num=SIZE_X, dtype=np.float32)
+    y = np.linspace(-10, 10, num=SIZE_Y, dtype=np.float32)
+    xx, yy = x[np.newaxis, :], y[:, np.newaxis]
+    z = np.sin(xx**2 + yy**2) / (xx**2 + yy**2)
+    return z
+
+
+def makeArcTan2():
+    """ Create atan2(x, y), which is good for testing circular color maps.
+        :return: 2D numpy array
+    """
+    x = np.linspace(-1, 1, num=SIZE_X, dtype=np.float32)
+    y = np.linspace(-1, 1, num=SIZE_Y, dtype=np.float32)
+    xx, yy = x[np.newaxis, :], y[:, np.newaxis]
+    return np.arctan2(xx, yy)
+
+
+def makeSpiral():
+    """ Create 'spiral' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
+
+        Smoothness test, has a near-uniform distribution of values.
+        :return: 2D numpy array
+    """
+    x = np.linspace(-1, 1, num=SIZE_X, dtype=np.float32)
+    y = np.linspace(-1, 1, num=SIZE_Y, dtype=np.float32)
+    xx, yy = x[np.newaxis, :], y[:, np.newaxis]
+    return np.arcsin(np.sin(2 * 2 * np.pi * (xx**2 + yy**2) + np.arctan2(xx, yy)))
+
+
+def makeSineProduct():
+    """ Create 'two sines products' function from Peter Karpov's blog http://inversed.ru/Blog_2.htm
+
+        Smoothness test.
+        :return: 2D numpy array
+    """
+    x = np.linspace(-np.pi, np.pi, num=SIZE_X, dtype=np.float32)
+    y = np.linspace(-np.pi, np.pi, num=SIZE_Y, dtype=np.float32)
+    xx, yy = x[np.newaxis, :], y[:, np.newaxis]
+    return np.sin(xx) * np.sin(yy) + np.sin(3*xx) * np.sin(3*yy)
+
+
+def makeUniformNoise():
+    """ Uniform noise between 0 and 1
+    """
+    return np.random.default_rng().random(size=(SIZE_X, SIZE_Y), dtype=np.float32)
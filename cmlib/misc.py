@@ -2,15 +2,32 @@
 """
 from __future__ import print_function
 
+import functools
+import glob
+import hashlib
+import io
+import json
 import logging
 import os.path
+import re
 import sys
+import threading
 
 import numpy as np
 
+try:
+    import orjson  # Optional. Faster than the json module from the standard library.
+except ImportError:
+    orjson = None
+
+from ._numba_kernels import HAS_NUMBA
+
+if HAS_NUMBA:
+    from ._numba_kernels import rgb_f32_to_rgba_u8
 
 DEBUGGING = False
 LOG_FMT = '%(asctime)s %(filename)25s:%(lineno)-4d : %(levelname)-7s: %(message)s'
+READ_BUFFER_SIZE = 1 << 20  # 1 MiB. Much larger than the color map text files.
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +61,29 @@ except Exception as ex:
 
 DATA_DIR = os.path.join(MODULE_DIR, "data")
 
+
+def _user_cache_dir():
+    """ Returns the per-user directory where the binary (.npy) versions of the data files are
+        cached. Can be set with the CMLIB_CACHE_DIR environment variable.
+    """
+    cache_dir = os.environ.get('CMLIB_CACHE_DIR')
+    if cache_dir:
+        return cache_dir
+
+    if sys.platform == 'win32':
+        base_dir = (os.environ.get('LOCALAPPDATA') or
+                    os.path.join(os.path.expanduser('~'), 'AppData', 'Local'))
+    elif sys.platform == 'darwin':
+        base_dir = os.path.expanduser('~/Library/Caches')
+    else:
+        base_dir = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base_dir, 'cmlib')
+
+
+# The cache files are not written in the package directory. It may be read-only, and the cache
+# files would end up in the distributions that are built from a source tree.
+CACHE_DIR = _user_cache_dir()
+
 def is_an_array(var, allow_none=False):
     """ Returns True if var is a numpy array.
     """
@@ -66,25 +106,86 @@ def check_class(var, cls, allowNone=False):
 
 
 
-def copy_data(source_file, target_file): # TODO: obsolete
-    """ Copies data file by reading it with numpy.loadtxt and saving with numpy.savetxt.
+def load_json(file_name):
+    """ Reads a JSON file and returns its contents.
+
+        Uses orjson if it is installed, the standard library json module otherwise.
+    """
+    with open(file_name, 'rb') as fp:
+        contents = fp.read()
+
+    if orjson is not None:
+        return orjson.loads(contents)
+    else:
+        return json.loads(contents)
+
+
+
+def parse_rgb_text_file(source_file, delimiter=None, dtype=np.float64):
+    """ Parses a text file with rgb values. Used by the ingest scripts.
 
-        This ensures all data has the same format and future users (possibly non-python users)
-        can use a single import routine.
+        Uses the C parser of pandas if pandas is installed, which is much faster than
+        numpy.loadtxt. Otherwise falls back on numpy.loadtxt. Pandas is imported here and not
+        at the top of the module, so that it is not imported by applications that use cmlib.
+
+        :param str delimiter: the column separator. If None, the columns are separated by
+            whitespace (like numpy.loadtxt).
+        :param dtype: the dtype of the result. The values are converted while parsing.
+        Returns Nx3 array
     """
-    logger.info("Copying: {} -> {}".format(source_file, target_file))
-    array = np.loadtxt(source_file)
-    save_rgb_floats(target_file, array)
+    try:
+        import pandas as pd
+    except ImportError:
+        return np.loadtxt(source_file, delimiter=delimiter, dtype=dtype)
+
+    sep = r'\s+' if delimiter is None else delimiter
+    # With memory_map the file is parsed directly from the page cache, without a read buffer.
+    df = pd.read_csv(source_file, sep=sep, header=None, comment='#', dtype=dtype,
+                     memory_map=True)
+    return df.to_numpy()
 
 
 
 def load_rgb_floats(source_file, delimiter=',', dtype=np.float32, **kwargs):
     """ Loads a color map array from a source file.
         Returns Nx3 array of 32 bits floats
+
+        The dtype is passed on to numpy.loadtxt so that the values are converted to 32 bits
+        while parsing. No intermediate 64 bits array is created. The three columns are passed
+        explicitly as usecols. Since NumPy 1.23 numpy.loadtxt is implemented in C.
+
+        This function is used at run time, so it doesn't use pandas like parse_rgb_text_file
+        does. Importing pandas takes longer than parsing the small color map files.
+    """
+    if logger.isEnabledFor(logging.DEBUG):  # Avoid the getcwd system call of abspath
+        logger.debug("Loading RGB values: {}".format(os.path.abspath(source_file)))
+    kwargs.setdefault('usecols', (0, 1, 2))
+
+    # A large buffer, so that the file is read with a single system call.
+    with open(source_file, 'r', buffering=READ_BUFFER_SIZE) as fp:
+        array = np.loadtxt(fp, delimiter=delimiter, dtype=dtype, **kwargs)
+    return array
+
+
+def load_rgb_floats_cached(source_file):
+    """ Loads a color map array from a text or .npy file and caches the result process-wide.
+
+        The cache is keyed on the absolute file name and its modification time, so a file is
+        loaded again if it has changed. The returned array is read-only because it is shared.
+        Returns Nx3 array of 32 bits floats
     """
-    source_file = os.path.abspath(source_file)
-    logger.debug("Loading RGB values: {}".format(source_file))
-    array = np.loadtxt(source_file, delimiter=delimiter, dtype=dtype, **kwargs)
+    return _load_rgb_floats_cached(os.path.abspath(source_file), os.path.getmtime(source_file))
+
+
+@functools.lru_cache(maxsize=256)
+def _load_rgb_floats_cached(source_file, mtime):
+    """ Helper for load_rgb_floats_cached. The mtime parameter is only used as cache key.
+    """
+    if source_file.endswith('.npy'):
+        array = load_rgb_floats_npy(source_file)
+    else:
+        array = load_rgb_floats(source_file)
+    array.setflags(write=False)
     return array
 
 
@@ -93,7 +194,187 @@ def save_rgb_floats(target_file, array):
 
         The array is expected to consist of floats.
     """
-    logger.debug("Saving RGB values: {}".format(os.path.abspath(target_file)))
-    np.savetxt(target_file, array, delimiter=', ', fmt='%8.6f')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Saving RGB values: {}".format(os.path.abspath(target_file)))
+
+    # Same output as np.savetxt(target_file, array, delimiter=', ', fmt='%8.6f'), but the
+    # contents are formatted with a single format operation and written with a single call.
+    array = np.asarray(array)
+    if array.ndim == 1:
+        array = array[:, np.newaxis]
+    row_fmt = ', '.join(['%8.6f'] * array.shape[1]) + '\n'
+    contents = (row_fmt * len(array)) % tuple(array.ravel().tolist())
+
+    with open(target_file, 'w') as fp:
+        fp.write(contents)
+
+
+_WHITESPACE_RE = re.compile(rb'[ \t]+')
+
+def normalize_rgb_text(source_file, target_file, num_columns=3):
+    """ Copies a whitespace separated text file to the format that save_rgb_floats writes.
+
+        The runs of white space are replaced by ', ' without parsing the numbers. This gives
+        the same output as save_rgb_floats if the source file already has six decimals per
+        value, as is the case for the Scientific Colour Maps. Blank lines are skipped.
+
+        Raises a ValueError if a line doesn't contain num_columns values.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Normalizing RGB text: {} -> {}".format(
+            os.path.abspath(source_file), os.path.abspath(target_file)))
+
+    with open(source_file, 'rb') as fp:
+        lines = fp.read().splitlines()
+
+    out_lines = []
+    for line_nr, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        out_line = _WHITESPACE_RE.sub(b', ', line)
+        if out_line.count(b', ') != num_columns - 1:
+            raise ValueError("Expected {} columns in line {} of {}: {!r}"
+                             .format(num_columns, line_nr, source_file, line))
+        out_lines.append(out_line)
+    out_lines.append(b'')
+
+    with open(target_file, 'wb') as fp:
+        fp.write(b'\n'.join(out_lines))
+
+
+
+def rgb_floats_to_rgba_uint8(rgb_floats):
+    """ Converts an Nx3 array of floats between 0 and 1 to an Nx4 array of uint8 RGBA values.
+
+        The floats are multiplied by 255 and rounded to the nearest integer. The alpha column is
+        set to 255. The output is allocated once and filled in place, the input is not modified.
+
+        Uses a Numba kernel if enabled (see the _numba_kernels module).
+    """
+    n_rows, depth = rgb_floats.shape
+    assert depth == 3, "Expected 3 columns. Got: {}".format(depth)
+
+    if HAS_NUMBA:
+        rgba_ints = np.empty(shape=(n_rows, 4), dtype=np.uint8)
+        rgb_f32_to_rgba_u8(np.ascontiguousarray(rgb_floats, dtype=np.float32), rgba_ints)
+        return rgba_ints
+
+    scaled = np.multiply(rgb_floats, 255.0, dtype=np.float32)
+    np.rint(scaled, out=scaled)
+    np.clip(scaled, 0, 255, out=scaled)
+
+    rgba_ints = np.empty(shape=(n_rows, 4), dtype=np.uint8)
+    rgba_ints[:, 0:3] = scaled
+    rgba_ints[:, 3].fill(255)
+    return rgba_ints
+
+
+
+def _cache_file_stem(file_name):
+    """ Returns the path in the CACHE_DIR, without extension, of the cache files of a data file.
+
+        The file name contains a hash of the absolute path, so that data files with the same
+        name in different directories don't share their cache files.
+        E.g. 'CET/CET-L1.csv' -> '~/.cache/cmlib/CET-L1-0123456789abcdef'
+    """
+    abs_path = os.path.abspath(file_name)
+    path_hash = hashlib.sha1(abs_path.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+    base_name = os.path.splitext(os.path.basename(abs_path))[0]
+    return os.path.join(CACHE_DIR, "{}-{}".format(base_name, path_hash))
+
+
+def npy_file_name(file_name):
+    """ Returns the name of the binary (.npy) file where the rgb floats of a color map text file
+        are cached.
+
+        E.g. 'CET/CET-L1.csv' -> '~/.cache/cmlib/CET-L1-0123456789abcdef.npy'
+    """
+    return _cache_file_stem(file_name) + '.npy'
+
+
+def rgba_cache_file_name(file_name):
+    """ Returns the name of the binary (.npy) file where the RGBA uint8 values that are derived
+        from a color map file are cached.
+
+        E.g. 'CET/CET-L1.csv' -> '~/.cache/cmlib/CET-L1-0123456789abcdef.rgba.npy'
+    """
+    return _cache_file_stem(file_name) + '.rgba.npy'
+
+
+def load_rgb_floats_npy(source_file):
+    """ Loads a color map array from a binary numpy (.npy) file.
+
+        No parsing is needed. The file is not memory mapped: the files are small, and a mapping
+        would keep a file descriptor open for every loaded color map.
+        Raises a ValueError if the file doesn't contain an Nx3 array of floats.
+        Returns a read-only Nx3 array of 32 bits floats
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Loading RGB values: {}".format(os.path.abspath(source_file)))
+    array = np.load(source_file)
+    if array.ndim != 2 or array.shape[1] != 3 or array.dtype.kind != 'f':
+        raise ValueError("Expected an Nx3 float array, got {} array with shape {}"
+                         .format(array.dtype, array.shape))
+    array = array.astype(np.float32, copy=False)
+    array.setflags(write=False)
+    return array
+
+
+def save_rgb_floats_npy(target_file, array):
+    """ Saves a color map array to a binary numpy (.npy) file as 32 bits floats.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Saving RGB values: {}".format(os.path.abspath(target_file)))
+    _save_npy_atomically(target_file, np.asarray(array, dtype=np.float32))
+
+
+def save_rgba_uint8_npy(target_file, array):
+    """ Saves an Nx4 RGBA array to a binary numpy (.npy) file as 8 bits unsigned integers.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Saving RGBA values: {}".format(os.path.abspath(target_file)))
+    _save_npy_atomically(target_file, np.asarray(array, dtype=np.uint8))
+
+
+def _save_npy_atomically(target_file, array):
+    """ Saves an array to a .npy file with write_file_atomically. Creates the directory if needed.
+    """
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    os.makedirs(os.path.dirname(os.path.abspath(target_file)), exist_ok=True)
+    write_file_atomically(target_file, buffer.getvalue())
+
+
+def write_file_atomically(target_file, contents):
+    """ Writes the contents (bytes or str) to a temporary file, which then atomically replaces
+        the target file.
+
+        Readers never see a partially written file, also not if the write is interrupted or if
+        several processes (or threads) write the same file. The temporary file name is therefore
+        unique per thread. It is removed if the write fails.
+    """
+    tmp_file = "{}.{}-{}.tmp".format(target_file, os.getpid(), threading.get_ident())
+    try:
+        with open(tmp_file, 'wb' if isinstance(contents, bytes) else 'w') as fp:
+            fp.write(contents)
+        os.replace(tmp_file, target_file)
+    except BaseException:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def convert_rgb_files_to_npy(catalog_dir):
+    """ Creates the cached binary .npy files of every CSV color map file in the catalog directory.
+
+        Two files are created in the CACHE_DIR: one with the rgb floats and one (.rgba.npy) with
+        the RGBA values converted to uint8. The ColorMap class will load these instead of the CSV
+        files if they are present, so neither parsing nor conversion is needed at run time.
+    """
+    for file_name in sorted(glob.glob(os.path.join(catalog_dir, '*.csv'))):
+        rgb_floats = load_rgb_floats(file_name)
+        save_rgb_floats_npy(npy_file_name(file_name), rgb_floats)
+        save_rgba_uint8_npy(rgba_cache_file_name(file_name), rgb_floats_to_rgba_uint8(rgb_floats))
 
 
@@ -6,6 +6,7 @@
     Then it will try first PyQt5 and then PySide2.
 
 """
+import importlib
 import os
 import sys
 
@@ -49,27 +50,55 @@ if QT_API_NAME is None:
         QT_API_NAME = API_PYSIDE2
 
 
-# Do imports.
+# The Qt modules and objects are imported lazily (PEP 562), when they are first accessed. So
+# only the modules that are actually used are imported. E.g. QtSvg is not imported by CmLib.
+# Maps the exported name to the module and the attribute in that module (None for the module).
 
 if QT_API_NAME == API_PYQT5:
-    from PyQt5 import QtCore, QtGui, QtWidgets, QtSvg
-    from PyQt5.QtCore import Qt
-    from PyQt5.QtCore import pyqtSignal as QtSignal
-    from PyQt5.QtCore import pyqtSlot as QtSlot
-    from PyQt5.Qt import PYQT_VERSION_STR as PYQT_VERSION
-    from PyQt5.Qt import QT_VERSION_STR as QT_VERSION
+    _IMPORTS = {
+        'QtCore': ('PyQt5.QtCore', None),
+        'QtGui': ('PyQt5.QtGui', None),
+        'QtWidgets': ('PyQt5.QtWidgets', None),
+        'QtSvg': ('PyQt5.QtSvg', None),
+        'Qt': ('PyQt5.QtCore', 'Qt'),
+        'QtSignal': ('PyQt5.QtCore', 'pyqtSignal'),
+        'QtSlot': ('PyQt5.QtCore', 'pyqtSlot'),
+        # Not from PyQt5.Qt, which imports all Qt modules.
+        'PYQT_VERSION': ('PyQt5.QtCore', 'PYQT_VERSION_STR'),
+        'QT_VERSION': ('PyQt5.QtCore', 'QT_VERSION_STR'),
+    }
 
 elif QT_API_NAME == API_PYSIDE2:
-
-    from PySide2 import QtCore, QtGui, QtWidgets, QtSvg
-    from PySide2.QtCore import Qt
-    from PySide2.QtCore import Signal as QtSignal
-    from PySide2.QtCore import Slot as QtSlot
-    from PySide2 import __version__ as PYQT_VERSION
-    from PySide2.QtCore import __version__ as QT_VERSION
+    _IMPORTS = {
+        'QtCore': ('PySide2.QtCore', None),
+        'QtGui': ('PySide2.QtGui', None),
+        'QtWidgets': ('PySide2.QtWidgets', None),
+        'QtSvg': ('PySide2.QtSvg', None),
+        'Qt': ('PySide2.QtCore', 'Qt'),
+        'QtSignal': ('PySide2.QtCore', 'Signal'),
+        'QtSlot': ('PySide2.QtCore', 'Slot'),
+        'PYQT_VERSION': ('PySide2', '__version__'),
+        'QT_VERSION': ('PySide2.QtCore', '__version__'),
+    }
 
 else:
 
     raise ValueError("Unknown Qt API {!r}. Should be one of: {}".format(QT_API_NAME, ALL_API))
 
 
+def __getattr__(name):
+    """ Imports the Qt module or object when it's first accessed.
+    """
+    try:
+        moduleName, attrName = _IMPORTS[name]
+    except KeyError:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    module = importlib.import_module(moduleName)
+    value = module if attrName is None else getattr(module, attrName)
+    globals()[name] = value  # Next time the module attribute is found without __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_IMPORTS))
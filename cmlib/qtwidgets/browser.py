@@ -3,8 +3,11 @@
 """ Functionality to browse through the color maps in a library
 """
 
+import functools
 import logging
 
+from collections import OrderedDict
+
 from ..cmap import DataCategory # TODO: why attempted relative import beyond top-level package
 from ..misc import check_class
 from .bindings import QtCore, QtWidgets, Qt, QtSignal
@@ -14,10 +17,6 @@ from .table import CmLibModel, CmLibProxyModel, CmLibTableViewer, ALL_ITEMS_STR
 
 logger = logging.getLogger(__name__)
 
-def _isChecked(checkState):
-    """ Returns if checkState == Qt.Checked """
-    return checkState == Qt.Checked
-
 def uniqueSort(lst):
     """ Returns the sorted list of unique list entries"""
     return sorted(list(set(lst)))
@@ -37,14 +36,20 @@ class FilterForm(QtWidgets.QWidget):
         self._proxyModel = proxyModel
         self._sourceModel = self._proxyModel.sourceModel()
         self._cmLib = self._sourceModel.cmLib
-        colMaps = self._cmLib.color_maps
+
+        # Filter changes that occur in the same event loop iteration result in a single
+        # sigFilterChanged signal, which is emitted when the timer times out.
+        self._filterChangedTimer = QtCore.QTimer(self)
+        self._filterChangedTimer.setSingleShot(True)
+        self._filterChangedTimer.setInterval(0)
+        self._filterChangedTimer.timeout.connect(self.sigFilterChanged)
 
         self.resetButton = QtWidgets.QPushButton("Reset Filters")
         self.resetButton.clicked.connect(self.resetFilters)
 
         self.catalogsGroupBox = QtWidgets.QGroupBox("Catalog")
         self.catalogsLayout = QtWidgets.QVBoxLayout(self.catalogsGroupBox)
-        allCatalogs = uniqueSort([cm.catalog_meta_data.name for cm in colMaps])
+        allCatalogs = self._cmLib.catalog_names
         self.catalogComboBox = self._createFilterCombobox(
             CmLibProxyModel.FT_CATALOG, allCatalogs)
         self.catalogsLayout.addWidget(self.catalogComboBox)
@@ -79,11 +84,7 @@ class FilterForm(QtWidgets.QWidget):
         self.tagsGroupBox = QtWidgets.QGroupBox("Tag filters")
         self.tagsLayout = QtWidgets.QVBoxLayout(self.tagsGroupBox)
 
-        tagSet = set([])
-        for cm in colMaps:
-            for tag in cm.meta_data.tags:
-                tagSet.add(tag)
-        allTags = sorted(list(tagSet))
+        allTags = self._cmLib.tags
 
         for tag in allTags:
             checkBox = self._createFilterCheckbox(CmLibProxyModel.FT_TAG, None, tag)
@@ -108,13 +109,10 @@ class FilterForm(QtWidgets.QWidget):
         """ Creates checkbox that filters on attrName with the and-operator.
         """
         combobox = QtWidgets.QComboBox()
-        combobox.addItem(ALL_ITEMS_STR)
-        combobox.addItems(allNames)
-
-        filterType2 = filterType # keep reference in closure
-
-        combobox.currentTextChanged.connect(lambda text:
-            self._onFilterIndexSelected(filterType2, text))
+        combobox.addItems([ALL_ITEMS_STR] + list(allNames))  # A single insert in the model
+        # Connect after adding the items, so that adding them doesn't change the filters.
+        combobox.currentTextChanged.connect(
+            functools.partial(self._onFilterIndexSelected, filterType))
 
         return combobox
 
@@ -123,16 +121,15 @@ class FilterForm(QtWidgets.QWidget):
         """ Called when the user checks a filter on or off
         """
         self._proxyModel.setExclusiveFilter(filterType, text)
-        self.sigFilterChanged.emit()
+        self._filterChangedTimer.start()
 
 
     def _createFilterCheckbox(self, filterType, attrName, desiredValue):
         """ Creates checkbox that filters on attrName with the and-operator.
         """
         checkBox = QtWidgets.QCheckBox()
-        filterType2, attrName2, desiredValue2 = filterType, attrName, desiredValue
-        checkBox.toggled.connect(lambda checked:
-            self._onFilterChecked(filterType2, attrName2, desiredValue2, checked))
+        checkBox.toggled.connect(
+            functools.partial(self._onFilterChecked, filterType, attrName, desiredValue))
         return checkBox
 
 
@@ -140,31 +137,47 @@ class FilterForm(QtWidgets.QWidget):
         """ Called when the user checks a filter on or off
         """
         self._proxyModel.toggleFilter(filterType, attrName, desiredValue, checked)
-        self.sigFilterChanged.emit()
+        self._filterChangedTimer.start()
         
 
     def resetFilters(self):
         """ Resets all checkboxes to their initial values
-        """
-        self.catalogComboBox.setCurrentText(ALL_ITEMS_STR)
-        self.categoryComboBox.setCurrentText(ALL_ITEMS_STR)
 
-        for checkbox in self._defaultOnCheckboxes:
-            checkbox.setChecked(True)
-
-        for checkbox in self._defaultOffCheckboxes:
-            checkbox.setChecked(False)
+            The rows are re-filtered, and sigFilterChanged is emitted, only once at the end.
+        """
+        self.setUpdatesEnabled(False)
+        self._proxyModel.setFilterUpdatesEnabled(False)
+        try:
+            self.catalogComboBox.setCurrentText(ALL_ITEMS_STR)
+            self.categoryComboBox.setCurrentText(ALL_ITEMS_STR)
+
+            for checkbox in self._defaultOnCheckboxes:
+                checkbox.setChecked(True)
+
+            for checkbox in self._defaultOffCheckboxes:
+                checkbox.setChecked(False)
+        finally:
+            self._proxyModel.setFilterUpdatesEnabled(True)
+            self.setUpdatesEnabled(True)
+
+        self._filterChangedTimer.stop()  # Pending changes are included in the signal below
+        self.sigFilterChanged.emit()
 
 
 
 class CmLibBrowserDialog(QtWidgets.QDialog):
     """ Widget to browse the though the color library
     """
+    MAX_PIXMAP_CACHE_SIZE = 128  # Max number of color bar pixmaps that are kept
+
     def __init__(self, cmLibModel, parent=None):
         super(CmLibBrowserDialog, self).__init__(parent=parent)
 
         check_class(cmLibModel, CmLibModel)
         self._cmLibModel = cmLibModel
+        # Color bar pixmaps by color map key, in LRU order. The BGRA array of the color map is
+        # stored with the pixmap to detect that the color data was replaced.
+        self._pixmapCache = OrderedDict()
 
         self.tableView = CmLibTableViewer(model=self._cmLibModel)
         self.tableView.sigColorMapHighlighted.connect(self._onColorMapSelected)
@@ -233,12 +246,30 @@ class CmLibBrowserDialog(QtWidgets.QDialog):
         """ Updates the color map image label with the selected color map
         """
         logger.debug("Selected ColorMap: {}".format(colorMap))
-        pixMap = makeColorBarPixmap(colorMap, width=256, height=25)
-        self.colorMapImageLabel.setPixmap(pixMap)
+        self.colorMapImageLabel.setPixmap(self._getColorBarPixmap(colorMap))
 
         self.colorMapNameLabel.setText(colorMap.pretty_name)
 
 
+    def _getColorBarPixmap(self, colorMap):
+        """ Returns the color bar pixmap of the color map.
+
+            The most recently used pixmaps are cached so that they are not created again when
+            the user revisits a color map.
+        """
+        key = colorMap.key
+        bgraArr, pixMap = self._pixmapCache.get(key, (None, None))
+        if bgraArr is not colorMap.bgra_uint8_array:
+            pixMap = makeColorBarPixmap(colorMap, width=256, height=25)
+            self._pixmapCache[key] = (colorMap.bgra_uint8_array, pixMap)
+            self._pixmapCache.move_to_end(key)
+            if len(self._pixmapCache) > self.MAX_PIXMAP_CACHE_SIZE:
+                self._pixmapCache.popitem(last=False)  # Remove the least recently used
+        else:
+            self._pixmapCache.move_to_end(key)
+        return pixMap
+
+
     def sizeHint(self):
         """ Holds the recommended size for the widget.
         """
@@ -19,6 +19,10 @@ def arrayToQImage(arr, share_memory=False, format = None):
         Be careful: make sure the image is destroyed before the numpy array,
         otherwise the image will point to unallocated memory!!
 
+        PyQt5 keeps a reference to the buffer as long as the QImage object exists, but copies
+        of the image that Qt makes internally don't. The callers in this package convert the
+        image to a QPixmap before the array goes out of scope.
+
         If format is not set it will default to QtGui.QImage.Format.Format_RGB32
 
         :rtype: QtGui.QImage
@@ -36,7 +40,7 @@ def arrayToQImage(arr, share_memory=False, format = None):
     assert arr_depth == 4, "Array depth must be 4. Got: {}".format(arr_depth)
 
     if not share_memory:
-        arr = np.copy(arr)
+        arr = np.array(arr, order='C')  # A C-contiguous copy, so that it's not copied again below
 
     if not arr.flags['C_CONTIGUOUS']:
         logger.warning("Converting array from Fortan contiguous to C contiguous")
@@ -56,21 +60,17 @@ def makeColorBarPixmap(colorMap, width=None, height=None, drawBorder=False):
 
         The resulting pixmap will be 1xN ARGB
     """
-    rgba_arr = colorMap.rgba_uint8_array
-
     width = round(width)
     height = round(height)
 
-    # Shuffle dimensions to BGRA from RGBA  (which is what Qt uses for ARGB in little-endian mode)
-    # Do this by swapping index 0 and 2. If using bgra_arr = rgba_arr[:, [2, 1, 0, 3]], the
-    # resulting bgra_arr will be fortran-contiguous, which would have to be fixed later on.
-    # Swapping dimensions is faster
-    bgra_arr = np.copy(rgba_arr)
-    bgra_arr[:, 0] = rgba_arr[:, 2]
-    bgra_arr[:, 2] = rgba_arr[:, 0]
-    del rgba_arr
+    # BGRA is what Qt uses for ARGB in little-endian mode. It's cached by the color map.
+    bgra_arr = colorMap.bgra_uint8_array
     imageArr = np.expand_dims(bgra_arr, 0)  # Add a dimension to get a N x 1 x 4 array
 
+    if width == len(bgra_arr) and height is not None:
+        # Only the rows need to be repeated. This is faster than scaling the image with Qt.
+        imageArr = np.ascontiguousarray(np.broadcast_to(imageArr, (height, width, 4)))
+
     assert imageArr.flags['C_CONTIGUOUS'], "expected C-contiguous array"
 
     image = arrayToQImage(imageArr, share_memory=True)
@@ -81,7 +81,8 @@ def makeColorBarPixmap(colorMap, width=None, height=None, drawBorder=False):
         if height is None:
             height = image.height()
 
-        image = image.scaled(width, height)
+        if width != image.width() or height != image.height():
+            image = image.scaled(width, height)
 
     pixmap = QtGui.QPixmap.fromImage(image)
 
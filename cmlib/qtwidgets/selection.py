@@ -3,8 +3,7 @@
 import logging
 
 from .bindings import QtCore, QtWidgets, QtSignal, QtSlot
-from .browser import CmLibBrowserDialog
-from .table import CmLibModel
+from .table import AbstractCmLibProxyModel, CmLibModel
 
 from ..cmap import ColorMap
 from ..misc import check_class
@@ -13,7 +12,7 @@ logger = logging.getLogger(__name__)
 
 
 
-class ComboProxyModel(QtCore.QSortFilterProxyModel):
+class ComboProxyModel(AbstractCmLibProxyModel):
     """ Proxy model used for sorting and filtering the combobox.
 
         Sorts by name and filter only favorites.
@@ -24,35 +23,53 @@ class ComboProxyModel(QtCore.QSortFilterProxyModel):
 
         # The color map selected from the browser dialog box
 
-        self.colorMapFromDialog = None
+        self._colorMapFromDialog = None
 
 
-    def lessThan(self, leftIndex, rightIndex):
-        """ Returns true if the value of the item referred to by the given index left is less than
-            the value of the item referred to by the given index right, otherwise returns false.
+    @property
+    def colorMapFromDialog(self):
+        """ The color map selected from the browser dialog box. It is shown even if it's not
+            a favorite. Call invalidateFilter after setting it.
+        """
+        return self._colorMapFromDialog
+
 
-            Sorts first by the desired column and uses the Key as tie breaker
+    @colorMapFromDialog.setter
+    def colorMapFromDialog(self, colorMap):
+        """ Sets the color map selected from the browser dialog box.
         """
-        sourceModel = self.sourceModel()
-        leftData  = sourceModel.data(leftIndex, role=CmLibModel.SORT_ROLE)
-        rightData = sourceModel.data(rightIndex, role=CmLibModel.SORT_ROLE)
+        self._colorMapFromDialog = colorMap
+        self._acceptedRows = None
+
 
-        leftKeyIndex = sourceModel.index(leftIndex.row(), CmLibModel.COL_KEY)
-        rightKeyIndex = sourceModel.index(rightIndex.row(), CmLibModel.COL_KEY)
+    def setColorMapFromDialog(self, colorMap):
+        """ Sets the color map selected from the browser dialog box.
+
+            Only re-filters the rows if this changes them. This is not the case if both the old
+            and the new color map are favorites (or None), since favorites are always shown.
+        """
+        oldColorMap = self._colorMapFromDialog
+        if colorMap is oldColorMap:
+            return
 
-        leftKey  = sourceModel.data(leftKeyIndex, role=CmLibModel.SORT_ROLE)
-        rightKey = sourceModel.data(rightKeyIndex, role=CmLibModel.SORT_ROLE)
+        self.colorMapFromDialog = colorMap
+        if (oldColorMap is None or oldColorMap.meta_data.favorite) and \
+                (colorMap is None or colorMap.meta_data.favorite):
+            return
 
-        return (leftData, leftKey) < (rightData, rightKey)
+        self.invalidateFilter()
 
 
     def filterAcceptsRow(self, sourceRow, sourceParentIndex):
-        """ Returns true if the item is a favorite
+        """ Returns true if the item is a favorite or the color map selected in the dialog.
         """
-        colMap = self.sourceModel().cmLib.color_maps[sourceRow]
-        accept = colMap.meta_data.favorite or colMap == self.colorMapFromDialog
-        #logger.debug("filterAcceptsRow = {}: {:15s}".format(accept, colMap.meta_data.pretty_name))
-        return accept
+        # The accepted rows are determined for all rows at once. Qt calls this method for every
+        # row, so the other calls only need a set lookup.
+        if self._acceptedRows is None:
+            self._acceptedRows = frozenset(
+                row for row, colMap in enumerate(self._colorMaps)
+                if colMap.meta_data.favorite or colMap == self._colorMapFromDialog)
+        return sourceRow in self._acceptedRows
 
 
     def getColorMapByRow(self, row):
@@ -104,6 +121,8 @@ class ColorSelectionWidget(QtWidgets.QWidget):
             QtCore.QSize(round(cmLibModel.iconBarWidth * scale),
                          round(cmLibModel.iconBarHeight * scale)))
 
+        # Imported here, so that importing this module doesn't import the browser module.
+        from .browser import CmLibBrowserDialog
         self.browser = CmLibBrowserDialog(cmLibModel=cmLibModel)
 
         self.openDialogButton = QtWidgets.QToolButton()
@@ -183,8 +202,7 @@ class ColorSelectionWidget(QtWidgets.QWidget):
         pretty_name = '' if colorMap is None else colorMap.pretty_name
         logger.debug("Accepted color map from dialog: {}".format(pretty_name))
 
-        self._proxyModel.colorMapFromDialog = colorMap
-        self._proxyModel.invalidateFilter()
+        self._proxyModel.setColorMapFromDialog(colorMap)
         self.comboBox.setCurrentText(pretty_name)
         self.sigColorMapChanged.emit(colorMap)
 
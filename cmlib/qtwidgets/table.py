@@ -6,7 +6,7 @@ import logging
 import numpy as np
 
 
-from .bindings import QtCore, QtWidgets, Qt, QtSignal
+from .bindings import QtCore, QtGui, QtWidgets, Qt, QtSignal
 from .toggle_column_mixin import ToggleColumnTableView
 from .qimg import makeColorBarPixmap
 from ..cmap import CmLib, ColorMap, CatalogMetaData, CmMetaData
@@ -19,9 +19,80 @@ _ALIGN_STRING = int(Qt.AlignVCenter | Qt.AlignLeft)
 _ALIGN_NUMBER = int(Qt.AlignVCenter | Qt.AlignRight)
 _ALIGN_BOOLEAN = int(Qt.AlignVCenter | Qt.AlignHCenter)
 
+_PRERENDER_BATCH_SIZE = 16 # number of icon bars that are rendered per event loop iteration
+
 
 ALL_ITEMS_STR = "All"
 
+
+def getSortKeys(sourceModel, column, cache):
+    """ Returns a list with the sort key of every row of the source model.
+
+        The sort key is the (data, key) tuple of the row, where data is the SORT_ROLE data of the
+        column. The color map key is the tie breaker.
+
+        The list is stored in the cache dict, by column, so that it is computed only once per
+        sort. The caller must clear the cache when the source model changes.
+    """
+    sortKeys = cache.get(column)
+    if sortKeys is None:
+        sortKeys = []
+        for row in range(sourceModel.rowCount()):
+            data = sourceModel.data(sourceModel.index(row, column), role=CmLibModel.SORT_ROLE)
+            key = sourceModel.data(sourceModel.index(row, CmLibModel.COL_KEY),
+                                   role=CmLibModel.SORT_ROLE)
+            sortKeys.append((data, key))
+        cache[column] = sortKeys
+    return sortKeys
+
+
+class AbstractCmLibProxyModel(QtCore.QSortFilterProxyModel):
+    """ Base class of the proxy models of a CmLibModel.
+
+        Caches the sort keys and the accepted rows, and resets them when the source model changes.
+        Descendants compute the accepted rows in their filterAcceptsRow method.
+    """
+    def __init__(self, parent):
+        super(AbstractCmLibProxyModel, self).__init__(parent)
+
+        self._acceptedRows = None  # The accepted source rows. Reset when anything changes.
+        self._colorMaps = []  # The color maps of the source model. Set in setSourceModel.
+        self._sortKeysCache = {}  # Sort keys by column. Cleared when the source changes.
+
+
+    def setSourceModel(self, sourceModel):
+        """ Sets the source model.
+
+            Connects the signals of the source model that reset the accepted rows and sort
+            keys. This is done before the base class connects its own slots, so that they are
+            reset before the proxy model filters and sorts the changed rows again.
+        """
+        sourceModel.dataChanged.connect(self._onSourceModelChanged)
+        sourceModel.rowsInserted.connect(self._onSourceModelChanged)
+        sourceModel.rowsRemoved.connect(self._onSourceModelChanged)
+        sourceModel.modelReset.connect(self._onSourceModelChanged)
+        sourceModel.layoutChanged.connect(self._onSourceModelChanged)
+        self._colorMaps = sourceModel.cmLib.color_maps  # Used for every row
+        super(AbstractCmLibProxyModel, self).setSourceModel(sourceModel)
+
+
+    def _onSourceModelChanged(self, *args):
+        """ Resets the accepted rows and sort keys so that they are computed again when needed.
+        """
+        self._acceptedRows = None
+        self._sortKeysCache.clear()
+
+
+    def lessThan(self, leftIndex, rightIndex):
+        """ Returns true if the value of the item referred to by the given index left is less than
+            the value of the item referred to by the given index right, otherwise returns false.
+
+            Sorts first by the desired column and uses the Key as tie breaker
+        """
+        sortKeys = getSortKeys(self.sourceModel(), leftIndex.column(), self._sortKeysCache)
+        return sortKeys[leftIndex.row()] < sortKeys[rightIndex.row()]
+
+
 #
 # def createTransparentColorMap():
 #     """ Creates a color map to use for when not color map is selected"""
@@ -59,6 +130,29 @@ class CmLibModel(QtCore.QAbstractTableModel):
     DEFAULT_WIDTHS = [32, 175, 100, 120, 100, 50, _HW_BOOL + 10,
                       _HW_BOOL, _HW_BOOL, _HW_BOOL, _HW_BOOL, 100, 200]
 
+    # Text alignment by column
+    ALIGNMENTS = (_ALIGN_BOOLEAN, _ALIGN_STRING, _ALIGN_STRING, _ALIGN_STRING, _ALIGN_STRING,
+                  _ALIGN_NUMBER, _ALIGN_BOOLEAN, _ALIGN_BOOLEAN, _ALIGN_BOOLEAN, _ALIGN_BOOLEAN,
+                  _ALIGN_BOOLEAN, _ALIGN_STRING, _ALIGN_STRING)
+
+    # Functions that return the display or sort data by column. Called as getter(self, colMap, role)
+    CELL_GETTERS = (
+        # For the favorite column a checkbox will be shown instead of a string
+        lambda self, cm, role: "" if role == Qt.DisplayRole else cm.meta_data.favorite,
+        lambda self, cm, role: cm.key,
+        lambda self, cm, role: cm.catalog_meta_data.key,
+        lambda self, cm, role: cm.meta_data.pretty_name,
+        lambda self, cm, role: cm.meta_data.category.name,
+        lambda self, cm, role: cm.num_colors,
+        lambda self, cm, role: self._boolToData(cm.meta_data.recommended),
+        lambda self, cm, role: self._boolToData(cm.meta_data.perceptually_uniform),
+        lambda self, cm, role: self._boolToData(cm.meta_data.black_white_friendly),
+        lambda self, cm, role: self._boolToData(cm.meta_data.color_blind_friendly),
+        lambda self, cm, role: self._boolToData(cm.meta_data.isoluminant),
+        lambda self, cm, role: ", ".join(cm.meta_data.tags),
+        lambda self, cm, role: cm.meta_data.notes,
+    )
+
     SORT_ROLE = Qt.UserRole
 
     def __init__(self, cmLib, **kwargs):
@@ -72,22 +166,51 @@ class CmLibModel(QtCore.QAbstractTableModel):
 
         assert len(self.HEADERS) == len(self.DEFAULT_WIDTHS), "sanity check failed."
         assert len(self.HEADERS) == len(self.HEADER_TOOL_TIPS), "sanity check failed."
+        assert len(self.HEADERS) == len(self.ALIGNMENTS), "sanity check failed."
+        assert len(self.HEADERS) == len(self.CELL_GETTERS), "sanity check failed."
 
         self._cmLib = cmLib
         self._colorMaps = cmLib.color_maps # used often
 
-        # Parameters that defined the legend bars. You should dataChanged on the column
-        # that contains the icons (COL_NAME) if you change these (or just reset the entire model.)
+        # Parameters that defined the legend bars. You should call rebuildIconBars if you change
+        # these (or just reset the entire model.)
         self.showIconBars = True
         self.drawIconBarBorder = True
         self.iconBarWidth = 64
         self.iconBarHeight = 16
 
-        # Check mark for boolean columns
+        # The icon bars are requested each time a cell is painted. They are cached by the color
+        # map key and the parameters above, so changing a parameter doesn't give stale icons.
+        # The BGRA array is stored with the pixmap to detect that the color data was replaced.
+        self._iconBarCache = {}
+
+        # When the first icon bar is requested, the icon bars of all rows are rendered in small
+        # batches when the event loop is idle, so that they are (mostly) ready when the rows are
+        # scrolled into view. Models that are never shown don't load the data of the color maps.
+        self._prerenderPending = True
+        self._prerenderRow = 0
+        self._prerenderTimer = QtCore.QTimer(self)
+        self._prerenderTimer.setInterval(0)
+        self._prerenderTimer.timeout.connect(self._prerenderIconBars)
+
+        # Check mark for boolean columns. Reset the model if you change this.
         #   ✓ Check mark Unicode: U+2713
         #   ✔︎ Heavy check mark Unicode: U+2714
         self.checkmarkChar = '✓︎'
 
+        # The display data of a row is computed the first time the row is shown, for all columns
+        # at once. Call invalidateRow if the meta data of a color map is changed.
+        self._displayData = {}
+        self._toolTips = {}  # The (catalog, color map) tool tips by row. Created on demand.
+
+        # Boolean meta data attributes as arrays with one element per row, by attribute name. Used
+        # by the proxy model to apply the quality filters to all rows at once. Created on demand.
+        self._metaDataFlags = {}
+
+        self.modelReset.connect(self._clearRowCaches)
+        self.rowsInserted.connect(self._clearRowCaches)
+        self.rowsRemoved.connect(self._clearRowCaches)
+
 
     @property
     def cmLib(self):
@@ -154,63 +277,139 @@ class CmLibModel(QtCore.QAbstractTableModel):
             return bool(value) # convert to bool just in case
 
 
-    def data(self, index, role=Qt.DisplayRole):
-        """ Returns the data stored under the given role for the item referred to by the index.
+    def _makeToolTips(self, colMap):
+        """ Returns a (catalogToolTip, colorMapToolTip) tuple for a color map.
         """
-        pos = self._posFromIndex(index)
-        if pos is None:
-            return None
-        else:
-            row, col = pos
+        cmd = colMap.catalog_meta_data
+        catalogToolTip = " ".join([cmd.name, cmd.version, cmd.date])
 
-        if role == Qt.DisplayRole or role == self.SORT_ROLE:
-            colMap = self._colorMaps[row]
-            md = colMap.meta_data
+        md = colMap.meta_data
+        colorMapToolTip = "{}<br/>Size: {} colors<br/>Category: {}".format(
+            md.pretty_name, colMap.num_colors,
+            md.category.name)
+        if md.notes:
+            colorMapToolTip = "{}<br/><br/>{}".format(colorMapToolTip, md.notes)
 
-            if col == self.COL_KEY:
-                return colMap.key
+        # Use rich text so the tool tip is word-wrapped
+        return ("<FONT COLOR=black>{}</FONT>".format(catalogToolTip),
+                "<FONT COLOR=black>{}</FONT>".format(colorMapToolTip))
 
-            elif col == self.COL_NAME:
-                return md.pretty_name
 
-            elif col == self.COL_CATALOG:
-                return colMap.catalog_meta_data.key
+    def _iconBar(self, colMap):
+        """ Returns the (cached) icon bar pixmap of a color map.
+        """
+        cacheKey = (colMap.key, self.iconBarWidth, self.iconBarHeight, self.drawIconBarBorder)
+        bgraArr, pixmap = self._iconBarCache.get(cacheKey, (None, None))
+        if bgraArr is not colMap.bgra_uint8_array:
+            pixmap = makeColorBarPixmap(colMap,
+                                        width=self.iconBarWidth,
+                                        height=self.iconBarHeight,
+                                        drawBorder=self.drawIconBarBorder)
+            self._iconBarCache[cacheKey] = (colMap.bgra_uint8_array, pixmap)
+        return pixmap
 
-            elif col == self.COL_CATEGORY:
-                return md.category.name
 
-            elif col == self.COL_SIZE:
-                return len(colMap.rgba_uint8_array)
+    def _startPrerendering(self):
+        """ Starts rendering the icon bars of all rows in the background.
 
-            elif col == self.COL_UNIF:
-                return self._boolToData(md.perceptually_uniform)
+            Does nothing without a QGuiApplication because pixmaps can't be painted then.
+        """
+        self._prerenderPending = False
+        if isinstance(QtCore.QCoreApplication.instance(), QtGui.QGuiApplication):
+            self._prerenderRow = 0
+            self._prerenderTimer.start()
 
-            elif col == self.COL_BW:
-                return self._boolToData(md.black_white_friendly)
 
-            elif col == self.COL_COLOR_BLIND:
-                return self._boolToData(md.color_blind_friendly)
+    def _prerenderIconBars(self):
+        """ Renders the icon bars of the next batch of rows. Stops the timer when all are done.
+        """
+        if not self.showIconBars:
+            self._prerenderTimer.stop()
+            return
 
-            elif col == self.COL_ISOLUMINANT:
-                return self._boolToData(md.isoluminant)
+        endRow = min(self._prerenderRow + _PRERENDER_BATCH_SIZE, len(self._colorMaps))
+        for colMap in self._colorMaps[self._prerenderRow:endRow]:
+            try:
+                self._iconBar(colMap)
+            except Exception as ex:
+                logger.warning("Unable to render icon bar of {}: {}".format(colMap, ex))
 
-            elif col == self.COL_TAGS:
-                return ", ".join(md.tags)
+        self._prerenderRow = endRow
+        if endRow >= len(self._colorMaps):
+            self._prerenderTimer.stop()
 
-            elif col == self.COL_NOTES:
-                return md.notes
 
-            elif col == self.COL_FAV:
-                if role == Qt.DisplayRole:
-                    return "" # A checkbox will be shown instead
-                else:
-                    return md.favorite
+    def rebuildIconBars(self):
+        """ Renders the icon bars again. Call this after changing the icon bar parameters.
 
-            elif col == self.COL_RECOMMENDED:
-                return self._boolToData(md.recommended)
+            Emits dataChanged for the column that contains the icons (COL_NAME).
+        """
+        self._iconBarCache.clear()
+        self._prerenderTimer.stop()
+        self._prerenderPending = True  # Restarted when the views request the icon bars again
+        if self._colorMaps:
+            self.dataChanged.emit(self.index(0, self.COL_NAME),
+                                  self.index(len(self._colorMaps) - 1, self.COL_NAME))
 
-            else:
-                raise AssertionError("Unexpected column: {}".format(col))
+
+    def _clearRowCaches(self, *args):
+        """ Clears the display data, tool tips and meta data flags of all rows.
+        """
+        self._displayData.clear()
+        self._toolTips.clear()
+        self._metaDataFlags.clear()
+
+
+    def getMetaDataFlags(self, attrName):
+        """ Returns a read-only boolean array with the meta data attribute attrName of all rows.
+
+            Values that are None (e.g. favorite when not set) are converted to False.
+        """
+        flags = self._metaDataFlags.get(attrName)
+        if flags is None:
+            flags = np.fromiter((getattr(colMap.meta_data, attrName) or False
+                                 for colMap in self._colorMaps),
+                                dtype=bool, count=len(self._colorMaps))
+            flags.setflags(write=False)
+            self._metaDataFlags[attrName] = flags
+        return flags
+
+
+    def invalidateRow(self, row):
+        """ Recomputes the display data of a row when it is shown again. Emits dataChanged.
+
+            Call this after changing the meta data of the color map in the row.
+        """
+        self._displayData.pop(row, None)
+        self._toolTips.pop(row, None)
+        self._metaDataFlags.clear()
+        self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+
+    def _cellData(self, row, col, role):
+        """ Returns the display or sort data of the cell at row and col.
+        """
+        return self.CELL_GETTERS[col](self, self._colorMaps[row], role)
+
+
+    def data(self, index, role=Qt.DisplayRole):
+        """ Returns the data stored under the given role for the item referred to by the index.
+        """
+        pos = self._posFromIndex(index)
+        if pos is None:
+            return None
+        else:
+            row, col = pos
+
+        if role == Qt.DisplayRole:
+            rowData = self._displayData.get(row)
+            if rowData is None:
+                rowData = tuple(self._cellData(row, c, role) for c in range(len(self.HEADERS)))
+                self._displayData[row] = rowData
+            return rowData[col]
+
+        elif role == self.SORT_ROLE:
+            return self._cellData(row, col, role)
 
         elif role == Qt.CheckStateRole:
             colMap = self._colorMaps[row]
@@ -223,41 +422,20 @@ class CmLibModel(QtCore.QAbstractTableModel):
                     return Qt.Unchecked
 
         elif role == Qt.TextAlignmentRole:
-            if col in (self.COL_KEY, self.COL_CATALOG, self.COL_NAME, self.COL_CATEGORY,
-                       self.COL_TAGS, self.COL_NOTES):
-                return _ALIGN_STRING
-            elif col in (self.COL_FAV, self.COL_RECOMMENDED, self.COL_ISOLUMINANT,
-                         self.COL_UNIF, self.COL_BW, self.COL_COLOR_BLIND):
-                return _ALIGN_BOOLEAN
-            elif col is self.COL_SIZE:
-                return _ALIGN_NUMBER
-            else:
-                raise AssertionError("Unexpected column: {}".format(col))
+            return self.ALIGNMENTS[col]
 
         elif role == Qt.ToolTipRole:
-            colMap = self._colorMaps[row]
-            if col == self.COL_CATALOG:
-                cmd = colMap.catalog_meta_data
-                toolTip = " ".join([cmd.name, cmd.version, cmd.date])
-            else:
-                md = colMap.meta_data
-                toolTip = "{}<br/>Size: {} colors<br/>Category: {}".format(
-                    md.pretty_name, len(colMap.rgba_uint8_array),
-                    md.category.name)
-                if md.notes:
-                    toolTip = "{}<br/><br/>{}".format(toolTip, md.notes)
-            # Use rich text so the tool tip is word-wrapped
-            #logger.debug("Tooltip: {}".format(toolTip))
-            return "<FONT COLOR=black>{}</FONT>".format(toolTip)
+            toolTips = self._toolTips.get(row)
+            if toolTips is None:
+                toolTips = self._toolTips[row] = self._makeToolTips(self._colorMaps[row])
+            catalogToolTip, colorMapToolTip = toolTips
+            return catalogToolTip if col == self.COL_CATALOG else colorMapToolTip
 
         elif role == Qt.DecorationRole:
             if col == self.COL_NAME and self.showIconBars:
-                colMap = self._colorMaps[row]
-                pixmap = makeColorBarPixmap(colMap,
-                                            width=self.iconBarWidth,
-                                            height=self.iconBarHeight,
-                                            drawBorder=self.drawIconBarBorder)
-                return pixmap
+                if self._prerenderPending:
+                    self._startPrerendering()
+                return self._iconBar(self._colorMaps[row])
 
         return None
 
@@ -285,6 +463,7 @@ class CmLibModel(QtCore.QAbstractTableModel):
         colMap = self._colorMaps[row]
         md = colMap.meta_data
         md.favorite = (value == Qt.Checked)
+        self._metaDataFlags.pop('favorite', None)
 
         logger.debug("{} emitting dataChanged signal for cell: ({}, {})".format(self, row, col))
         self.dataChanged.emit(index, index)
@@ -342,7 +521,7 @@ class CmLibModel(QtCore.QAbstractTableModel):
 
 
 
-class CmLibProxyModel(QtCore.QSortFilterProxyModel):
+class CmLibProxyModel(AbstractCmLibProxyModel):
     """ Proxy model that overrides the sorting.
     """
 
@@ -363,6 +542,7 @@ class CmLibProxyModel(QtCore.QSortFilterProxyModel):
             CmLibProxyModel.FT_TAG: [],
             CmLibProxyModel.FT_QUALITY: [],
         }
+        self._filterUpdatesEnabled = True
 
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -381,30 +561,6 @@ class CmLibProxyModel(QtCore.QSortFilterProxyModel):
             return None
 
 
-    def lessThan(self, leftIndex, rightIndex):
-        """ Returns true if the value of the item referred to by the given index left is less than
-            the value of the item referred to by the given index right, otherwise returns false.
-
-            Sorts first by the desired column and uses the Key as tie breaker
-        """
-        sourceModel = self.sourceModel()
-        leftData  = sourceModel.data(leftIndex, role=CmLibModel.SORT_ROLE)
-        rightData = sourceModel.data(rightIndex, role=CmLibModel.SORT_ROLE)
-
-        leftKeyIndex = sourceModel.index(leftIndex.row(), CmLibModel.COL_KEY)
-        rightKeyIndex = sourceModel.index(rightIndex.row(), CmLibModel.COL_KEY)
-
-        leftKey  = sourceModel.data(leftKeyIndex, role=CmLibModel.SORT_ROLE)
-        rightKey = sourceModel.data(rightKeyIndex, role=CmLibModel.SORT_ROLE)
-
-        # logger.debug("lessThan: {} <? {} = {}".format(
-        #     (leftData, leftKey), (rightData, rightKey),
-        #     (leftData, leftKey) < (rightData, rightKey)
-        # ))
-
-        return (leftData, leftKey) < (rightData, rightKey)
-
-
     def setExclusiveFilter(self, filterType, desiredValue):
         """ Sets a filter that can have only one value at the time.
             These filters (catalog, category) are typically set by selecting an item of a combobox.
@@ -415,7 +571,9 @@ class CmLibProxyModel(QtCore.QSortFilterProxyModel):
         for key, value in sorted(self._exlusiveFilters.items()):
             logger.debug("   {:15s}{}".format(key, value))
 
-        self.invalidateFilter()
+        self._acceptedRows = None
+        if self._filterUpdatesEnabled:
+            self.invalidateFilter()
 
 
     def toggleFilter(self, filterType, attrName, desiredValue, isFilterAdded):
@@ -433,7 +591,19 @@ class CmLibProxyModel(QtCore.QSortFilterProxyModel):
 
         # for key, value in sorted(self._filters.items()):
         #     logger.debug("   {:15s}{}".format(key, value))
-        self.invalidateFilter()
+        self._acceptedRows = None
+        if self._filterUpdatesEnabled:
+            self.invalidateFilter()
+
+
+    def setFilterUpdatesEnabled(self, enabled):
+        """ If enabled is False, changing a filter doesn't re-filter the rows until the filter
+            updates are enabled again. Use this when setting many filters at once.
+        """
+        self._filterUpdatesEnabled = enabled
+        if enabled:
+            self._acceptedRows = None
+            self.invalidateFilter()
 
 
     def filterAcceptsRow(self, sourceRow, sourceParentIndex):
@@ -442,28 +612,44 @@ class CmLibProxyModel(QtCore.QSortFilterProxyModel):
         """
         assert not sourceParentIndex.isValid(), "sourceParentIndex is not the root index"
 
-        colMap = self.sourceModel().cmLib.color_maps[sourceRow]
+        # The filters are evaluated for all rows at once. Qt calls this method for every row,
+        # so the other calls only need to look up the result.
+        if self._acceptedRows is None:
+            self._acceptedRows = self._computeAcceptedRows()
+        return bool(self._acceptedRows[sourceRow])
 
-        # Exclusive filters (catalog and catergory)
-        catMd = colMap.catalog_meta_data
-        catalogFilter = self._exlusiveFilters[CmLibProxyModel.FT_CATALOG]
-        acceptCatalog = (catalogFilter == catMd.name or catalogFilter == ALL_ITEMS_STR)
 
-        md = colMap.meta_data
+    def _computeAcceptedRows(self):
+        """ Returns a boolean array that is True for the source rows that pass all filters.
+        """
+        catalogFilter = self._exlusiveFilters[CmLibProxyModel.FT_CATALOG]
         categoryFilter = self._exlusiveFilters[CmLibProxyModel.FT_CATEGORY]
-        acceptCategory = (categoryFilter == md.category.name or categoryFilter == ALL_ITEMS_STR)
+        qualityFilters = self._filters[CmLibProxyModel.FT_QUALITY]
+        tagFilters = [desired for _, desired in self._filters[CmLibProxyModel.FT_TAG]]
+
+        # Filters that must all be true. These are applied to all rows at once.
+        acceptedRows = np.ones(len(self._colorMaps), dtype=bool)
+        for attrName, desired in qualityFilters:
+            flags = self.sourceModel().getMetaDataFlags(attrName)
+            acceptedRows &= (flags if desired else ~flags)
 
-        # Filters that must all be true
-        acceptQuality = all([getattr(md, attrName) == desired for attrName, desired in
-                             self._filters[CmLibProxyModel.FT_QUALITY]])  # Note test for all
+        for row in np.flatnonzero(acceptedRows):
+            colMap = self._colorMaps[row]
+
+            # Exclusive filters (catalog and catergory)
+            if catalogFilter != ALL_ITEMS_STR and catalogFilter != colMap.catalog_meta_data.name:
+                acceptedRows[row] = False
+                continue
 
-        acceptTags = all([desired in md.tags for _, desired in
-                          self._filters[CmLibProxyModel.FT_TAG]])
+            md = colMap.meta_data
+            if categoryFilter != ALL_ITEMS_STR and categoryFilter != md.category.name:
+                acceptedRows[row] = False
+                continue
 
-        accept = all([acceptCatalog, acceptCategory, acceptQuality, acceptTags])
+            if not all(desired in md.tags for desired in tagFilters):
+                acceptedRows[row] = False
 
-        # logger.debug("filterAcceptsRow = {}: {:15s}".format(accept, md.pretty_name))
-        return accept
+        return acceptedRows
 
 
     def getColorMapByProxyIndex(self, proxyIdx):
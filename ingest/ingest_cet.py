@@ -4,16 +4,18 @@
 import logging
 import os.path
 
-import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 from cmlib.cmap import DataCategory, CmMetaData, CatalogMetaData
-from cmlib.misc import LOG_FMT, save_rgb_floats
+from cmlib.misc import LOG_FMT, parse_rgb_text_file, save_rgb_floats
 
 logger = logging.getLogger(__name__)
 
 SOURCE_DIR = "../source_data/CET"
 TARGET_DIR = "../cmlib/data/CET"
 
+ISOLUMINANT = frozenset(['CET-I1', 'CET-I2', 'CET-I3', 'CET-D11', 'CET-D12'])
+
 MAPS = [
     # Linear
     ('CET-L1',  'linear_grey_0-100_c0_n256', DataCategory.Sequential),
@@ -80,6 +82,39 @@ MAPS = [
     ('CET-CBTC2', 'cyclic-tritanopic_wrwc_70-100_c20_n256', DataCategory.Cyclic),
 ]
 
+def ingest_map(name, notes, category):
+    """ Copies the data of a single color map and writes its meta data.
+    """
+    data_file = "{}.csv".format(name)
+    source_file = os.path.join(SOURCE_DIR, data_file)
+    target_file = os.path.join(TARGET_DIR, data_file)
+
+    array = parse_rgb_text_file(source_file, delimiter=',')
+    save_rgb_floats(target_file, array)
+
+    md = CmMetaData(name)
+    md.file_name = data_file
+    md.category = category
+    md.notes = notes
+    md.recommended = True
+    md.perceptually_uniform = True
+
+    if name.startswith('CET-L'):
+        md.black_white_friendly = True
+
+    if name.startswith('CET-R'):
+        md.tags = ['Rainbow']
+
+    if name in ISOLUMINANT:
+        md.isoluminant = True
+
+    if name.startswith('CET-CB'):
+        md.color_blind_friendly = True
+
+    md.save_to_json_file(os.path.join(TARGET_DIR, "{}.json".format(name)))
+
+
+
 def ingest_files():
 
     smd = CatalogMetaData()
@@ -94,34 +129,11 @@ def ingest_files():
 
     smd.save_to_json_file(os.path.join(TARGET_DIR, CatalogMetaData.DEFAULT_FILE_NAME))
 
-    for name, notes, category in MAPS:
-        data_file = "{}.csv".format(name)
-        source_file = os.path.join(SOURCE_DIR, data_file)
-        target_file = os.path.join(TARGET_DIR, data_file)
-
-        array = np.loadtxt(source_file, delimiter=',')
-        save_rgb_floats(target_file, array)
-
-        md = CmMetaData(name)
-        md.file_name = data_file
-        md.category = category
-        md.notes = notes
-        md.recommended = True
-        md.perceptually_uniform = True
-
-        if name.startswith('CET-L'):
-            md.black_white_friendly = True
-
-        if name.startswith('CET-R'):
-            md.tags = ['Rainbow']
-
-        if name in ['CET-I1', 'CET-I2', 'CET-I3', 'CET-D11', 'CET-D12']:
-            md.isoluminant = True
-
-        if name.startswith('CET-CB'):
-            md.color_blind_friendly = True
-
-        md.save_to_json_file(os.path.join(TARGET_DIR, "{}.json".format(name)))
+    # The maps are independent, so they are processed in parallel to overlap the file I/O.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(ingest_map, *entry) for entry in MAPS]
+        for future in futures:
+            future.result()  # Re-raises exceptions from the worker threads
 
 
 
@@ -18,6 +18,8 @@ from matplotlib.colors import ListedColormap, LinearSegmentedColormap
 from cmlib.cmap import DataCategory, CmMetaData, CatalogMetaData
 from cmlib.misc import LOG_FMT, save_rgb_floats
 
+from make_builtin_luts import make_builtin_luts
+
 
 logger = logging.getLogger(__name__)
 
@@ -327,6 +329,9 @@ def main():
     #   gist_yarg  identical to *gray_r*
     #   binary     identical to *gray_r*
 
+    # The built-in RGBA data of the most used color maps must match the new data files.
+    make_builtin_luts()
+
 
 
 if __name__ == "__main__":
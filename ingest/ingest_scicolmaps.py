@@ -4,13 +4,21 @@ import logging
 import os.path
 
 from cmlib.cmap import DataCategory, CmMetaData, CatalogMetaData
-from cmlib.misc import LOG_FMT, load_rgb_floats, save_rgb_floats
+from cmlib.misc import LOG_FMT, normalize_rgb_text
 
 logger = logging.getLogger(__name__)
 
 SOURCE_DIR = "../source_data/ScientificColourMaps4"
 TARGET_DIR = "../cmlib/data/SciColMaps"
 
+BW_FRIENDLY = frozenset(["oslo", "grayC", "turku"])
+
+# Tags by color map name. Roma is also suited for seismic tomography, but that isn't a tag (yet).
+TAGS = {
+    "oleron": ['Geo'],
+    "batlow": ['Rainbow'],
+}
+
 MAPS = [
     ("acton", DataCategory.Sequential),
     ("bamako", DataCategory.Sequential),
@@ -51,12 +59,13 @@ def ingest_files():
 
     smd.save_to_json_file(os.path.join(TARGET_DIR, CatalogMetaData.DEFAULT_FILE_NAME))
 
+    # A plain loop: the files are not parsed, so starting worker processes would take longer
+    # than the work itself.
     for name, category in MAPS:
         data_file = "{}.csv".format(name)
         source_file = os.path.join(SOURCE_DIR, name, "{}.txt".format(name))
         target_file = os.path.join(TARGET_DIR, data_file)
-        rgb_arr = load_rgb_floats(source_file, delimiter=None)
-        save_rgb_floats(target_file, rgb_arr)
+        normalize_rgb_text(source_file, target_file)  # The values already have six decimals
 
         md = CmMetaData(name)
         md.file_name = data_file
@@ -64,14 +73,9 @@ def ingest_files():
         md.recommended = True
         md.perceptually_uniform = True
 
-        md.black_white_friendly = name in ("oslo", "grayC", "turku")
+        md.black_white_friendly = name in BW_FRIENDLY
 
-        if name == "oleron":
-            md.tags = ['Geo']
-        elif name == "batlow":
-            md.tags = ['Rainbow']
-        elif name == "roma":
-            "seismic-tomography"
+        md.tags = list(TAGS.get(name, []))
 
         md.save_to_json_file(os.path.join(TARGET_DIR, "{}.json".format(name)))
 
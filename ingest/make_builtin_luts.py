@@ -0,0 +1,68 @@
+""" Generates the cmlib/_builtin_luts.py module with the RGBA data of frequently used color maps.
+
+    The module must be regenerated if the data of these color maps changes. This is done at the
+    end of ingest_mpl.py. The library trusts the packaged data files to match the module.
+"""
+import logging
+import os.path
+
+from cmlib.misc import LOG_FMT, load_rgb_floats, rgb_floats_to_rgba_uint8
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = "../cmlib/data"
+TARGET_FILE = "../cmlib/_builtin_luts.py"
+
+# Data files relative to the SOURCE_DIR. Always use forward slashes.
+DATA_FILES = [
+    'MatPlotLib/viridis.csv',
+    'MatPlotLib/plasma.csv',
+    'MatPlotLib/inferno.csv',
+    'MatPlotLib/magma.csv',
+    'MatPlotLib/cividis.csv',
+]
+
+HEADER = '''""" RGBA uint8 data of frequently used color maps.
+
+    Generated by ingest/make_builtin_luts.py. Do not edit.
+
+    The arrays are created from bytes objects so that they are read-only and no data files need
+    to be read for these color maps.
+"""
+import numpy as np
+
+
+def _lut(hex_str):
+    """ Returns a read-only Nx4 uint8 array from a hexadecimal string with RGBA values.
+    """
+    return np.frombuffer(bytes.fromhex(hex_str), dtype=np.uint8).reshape(-1, 4)
+
+
+# Maps data files, relative to the cmlib data directory, to their RGBA data.
+BUILTIN_RGBA_LUTS = {}
+'''
+
+COLORS_PER_LINE = 8
+
+
+def make_builtin_luts():
+
+    lines = [HEADER]
+    for data_file in DATA_FILES:
+        source_file = os.path.join(SOURCE_DIR, data_file)
+        rgba_arr = rgb_floats_to_rgba_uint8(load_rgb_floats(source_file))
+
+        lines.append("\nBUILTIN_RGBA_LUTS[{!r}] = _lut(\n".format(data_file))
+        for start in range(0, len(rgba_arr), COLORS_PER_LINE):
+            chunk = rgba_arr[start:start + COLORS_PER_LINE]
+            lines.append("    '{}'\n".format(chunk.tobytes().hex()))
+        lines.append(")\n")
+
+    logger.info("Writing: {}".format(TARGET_FILE))
+    with open(TARGET_FILE, 'w') as fp:
+        fp.write("".join(lines))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level='DEBUG', format=LOG_FMT)
+    make_builtin_luts()
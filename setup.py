@@ -49,12 +49,14 @@ history = open('HISTORY.rst').read().replace('.. :changelog:', '')
 
 install_requires = [
     #"PyQt5 >= 5.6.0", # Don't require PyQt. See comment above
-    "numpy >= 1.11",
+    "numpy >= 1.23",  # loadtxt is implemented in C since 1.23
 ]
 
 
 from os import listdir
-catalog_dirs = ['data/{}/*'.format(path) for path in listdir('cmlib/data')]
+# Only the data and meta data files. Not, for instance, cache files of older versions of cmlib.
+catalog_dirs = ['data/{}/*.{}'.format(path, ext)
+                for path in listdir('cmlib/data') for ext in ('csv', 'json')]
 
 
 #from cmlib.misc import __version__